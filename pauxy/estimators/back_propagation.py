@@ -1,3 +1,4 @@
+from concurrent.futures import ThreadPoolExecutor
 import h5py
 import numpy
 try:
@@ -5,11 +6,13 @@ try:
     mpi4py.rc.recv_mprobe = False
     from mpi4py import MPI
     mpi_sum = MPI.SUM
+    mpi_in_place = MPI.IN_PLACE
 except ImportError:
     mpi_sum = None
+    mpi_in_place = None
 import sys
 from pauxy.estimators.utils import H5EstimatorHelper
-from pauxy.estimators.greens_function import gab
+from pauxy.estimators.greens_function import gab_batched
 from pauxy.estimators.mixed import local_energy
 from pauxy.estimators.ekt import ekt_1p_fock_opt, ekt_1h_fock_opt
 from pauxy.propagation.generic import back_propagate_generic
@@ -51,9 +54,10 @@ class BackPropagation(object):
     G : :class:`numpy.ndarray`
         One-particle RDM.
     estimates : :class:`numpy.ndarray`
-        Store for mixed estimates per processor.
-    global_estimates : :class:`numpy.ndarray`
-        Store for mixed estimates accross all processors.
+        Store for mixed estimates per processor. Reduced in place across all
+        processors on the root processor before output.
+    G_acc : :class:`numpy.ndarray`
+        View of the one-particle RDM block of estimates.
     output : :class:`pauxy.estimators.H5EstimatorHelper`
         Class for outputting data to HDF5 group.
     rdm_output : :class:`pauxy.estimators.H5EstimatorHelper`
@@ -78,9 +82,17 @@ class BackPropagation(object):
         self.nstblz = qmc.nstblz
         self.BT2 = BT2
         self.restore_weights = bp.get('restore_weights', None)
+        # Walkers are back propagated independently so can be farmed out to
+        # threads (numpy releases the GIL in BLAS/LAPACK calls).
+        self.nthreads = bp.get('nthreads', 1)
         if root:
             print("# restore_weights = {}".format(self.restore_weights))
+            print("# Number of back propagation threads: {}".format(self.nthreads))
         self.dt = qmc.dt
+        # Scratch space for back propagated / historic wavefunctions of all
+        # walkers. Allocated on first use once the number of walkers is known.
+        self.phi_bp = None
+        self.phi_old = None
         dms_size = self.G.size
         # Abuse of language for the moment. Only accumulates S(k) for UEG.
         # TODO: Add functionality to accumulate 2RDM?
@@ -102,8 +114,27 @@ class BackPropagation(object):
             dms_size += self.ekt_fock_1p.size
 
         self.estimates = numpy.zeros(self.nreg+1+dms_size, dtype=dtype)
-        self.global_estimates = numpy.zeros(self.nreg+1+dms_size,
-                                            dtype=dtype)
+        # Views into estimates so accumulation avoids flattened copies.
+        start = self.nreg + 1
+        end = start + self.G.size
+        self.G_acc = self.estimates[start:end].reshape(self.G.shape)
+        if self.calc_two_rdm is not None:
+            start = end
+            end = end + self.two_rdm.size
+            self.two_rdm_acc = (
+                    self.estimates[start:end].reshape(self.two_rdm.shape)
+            )
+        if self.eval_ekt:
+            start = end
+            end = end + self.ekt_fock_1p.size
+            self.ekt_fock_1p_acc = (
+                    self.estimates[start:end].reshape(self.ekt_fock_1p.shape)
+            )
+            start = end
+            end = end + self.ekt_fock_1h.size
+            self.ekt_fock_1h_acc = (
+                    self.estimates[start:end].reshape(self.ekt_fock_1h.shape)
+            )
         self.key = {
             'ETotal': "BP estimate for total energy.",
             'E1B': "BP estimate for one-body energy.",
@@ -124,6 +155,21 @@ class BackPropagation(object):
             else:
                 self.back_propagate = pauxy.propagation.hubbard.back_propagate
 
+    def back_propagate_walker(self, phi, configs, system):
+        """Back propagate a single wavefunction in place.
+
+        Parameters
+        ----------
+        phi : :class:`numpy.ndarray`
+            Wavefunction to back propagate.
+        configs : :class:`pauxy.walkers.stack.FieldConfig`
+            Walker's auxiliary field configurations.
+        system : system object in general.
+            Container for model input options.
+        """
+        self.back_propagate(phi, configs, system, self.nstblz, self.BT2,
+                            self.dt)
+
     def update_uhf(self, system, qmc, trial, psi, step, free_projection=False):
         """Calculate back-propagated estimates for RHF/UHF walkers.
 
@@ -146,16 +192,37 @@ class BackPropagation(object):
         if buff_ix not in self.splits:
             return
         nup = system.nup
+        # Back propagation is independent for each walker, while the Green's
+        # functions can then be evaluated for all walkers at once.
+        nwalkers = len(psi.walkers)
+        if self.init_walker:
+            phi_init = trial.init
+        else:
+            phi_init = trial.psi
+        shape = (nwalkers,)+phi_init.shape
+        if (self.phi_bp is None or self.phi_bp.shape != shape or
+                self.phi_bp.dtype != phi_init.dtype):
+            self.phi_bp = numpy.empty(shape, dtype=phi_init.dtype)
+            self.phi_old = numpy.empty(shape,
+                                       dtype=psi.walkers[0].phi_old.dtype)
+        numpy.copyto(self.phi_bp, phi_init)
+        for (i, wnm) in enumerate(psi.walkers):
+            numpy.copyto(self.phi_old[i], wnm.phi_old)
+        configs = [wnm.field_configs for wnm in psi.walkers]
+        # TODO: Fix for ITCF.
+        if self.nthreads > 1:
+            with ThreadPoolExecutor(max_workers=self.nthreads) as pool:
+                list(pool.map(self.back_propagate_walker, self.phi_bp,
+                              configs, [system]*nwalkers))
+        else:
+            for (phi, c) in zip(self.phi_bp, configs):
+                self.back_propagate_walker(phi, c, system)
+        phi_bp, phi_old = self.phi_bp, self.phi_old
+        Gup = gab_batched(phi_bp[:,:,:nup], phi_old[:,:,:nup])
+        Gdn = gab_batched(phi_bp[:,:,nup:], phi_old[:,:,nup:])
         for i, wnm in enumerate(psi.walkers):
-            if self.init_walker:
-                phi_bp = trial.init.copy()
-            else:
-                phi_bp = trial.psi.copy()
-            # TODO: Fix for ITCF.
-            self.back_propagate(phi_bp, wnm.field_configs, system,
-                                self.nstblz, self.BT2, self.dt)
-            self.G[0] = gab(phi_bp[:,:nup], wnm.phi_old[:,:nup]).T
-            self.G[1] = gab(phi_bp[:,nup:], wnm.phi_old[:,nup:]).T
+            self.G[0] = Gup[i].T
+            self.G[1] = Gdn[i].T
 
             if self.eval_energy:
                 eloc = local_energy(system, self.G, opt=False,
@@ -200,22 +267,14 @@ class BackPropagation(object):
             self.estimates[:self.nreg] += weight*energies
             self.estimates[self.nreg] += weight
 
-            start = self.nreg + 1
-            end = start + self.G.size
-            self.estimates[start:end] += weight*self.G.flatten()
+            self.G_acc += weight*self.G
 
             if self.calc_two_rdm is not None:
-                start = end
-                end = end + self.two_rdm.size
-                self.estimates[start:end] += weight*self.two_rdm.flatten()
+                self.two_rdm_acc += weight*self.two_rdm
 
             if self.eval_ekt:
-                start = end
-                end = end + self.ekt_fock_1p.size
-                self.estimates[start:end] += weight*self.ekt_fock_1p.flatten()
-                start = end
-                end = end + self.ekt_fock_1h.size
-                self.estimates[start:end] += weight*self.ekt_fock_1h.flatten()
+                self.ekt_fock_1p_acc += weight*self.ekt_fock_1p
+                self.ekt_fock_1h_acc += weight*self.ekt_fock_1h
 
             if buff_ix == self.splits[-1]:
                 wnm.field_configs.reset()
@@ -282,27 +341,30 @@ class BackPropagation(object):
         """
         if not self.accumulated:
             return
-        comm.Reduce(self.estimates, self.global_estimates, op=mpi_sum)
         if comm.rank == 0:
-            weight = self.global_estimates[self.nreg]
+            comm.Reduce(mpi_in_place, self.estimates, op=mpi_sum)
+        else:
+            comm.Reduce(self.estimates, None, op=mpi_sum)
+        if comm.rank == 0:
+            weight = self.estimates[self.nreg]
             self.output.push(numpy.array([weight]),
                              'denominator_{:d}'.format(self.buff_ix))
             if self.eval_energy:
                 if free_projection:
-                    self.output.push(self.global_estimates[:self.nreg],
+                    self.output.push(self.estimates[:self.nreg],
                                      'energies_{:d}'.format(self.buff_ix))
                 else:
-                    self.output.push(self.global_estimates[:self.nreg]/weight,
+                    self.output.push(self.estimates[:self.nreg]/weight,
                                      'energies_{:d}'.format(self.buff_ix))
             if self.calc_one_rdm:
                 start = self.nreg + 1
                 end = self.nreg + 1 + self.G.size
-                rdm = self.global_estimates[start:end].reshape(self.G.shape)
+                rdm = self.estimates[start:end].reshape(self.G.shape)
                 self.output.push(rdm, 'one_rdm_{:d}'.format(self.buff_ix))
             if self.calc_two_rdm:
                 start = self.nreg + 1 + self.G.size
                 end = start + self.two_rdm.size
-                rdm = self.global_estimates[start:end].reshape(self.two_rdm.shape)
+                rdm = self.estimates[start:end].reshape(self.two_rdm.shape)
                 self.output.push(rdm, 'two_rdm_{:d}'.format(self.buff_ix))
 
             if self.eval_ekt:
@@ -313,11 +375,11 @@ class BackPropagation(object):
                     start += self.two_rdm.size
                 
                 end = start + self.ekt_fock_1p.size
-                fock = self.global_estimates[start:end].reshape(self.ekt_fock_1p.shape)
+                fock = self.estimates[start:end].reshape(self.ekt_fock_1p.shape)
                 self.output.push(fock, 'fock_1p_{:d}'.format(self.buff_ix))
                 start = end
                 end = end + self.ekt_fock_1h.size
-                fock = self.global_estimates[start:end].reshape(self.ekt_fock_1h.shape)
+                fock = self.estimates[start:end].reshape(self.ekt_fock_1h.shape)
                 self.output.push(fock, 'fock_1h_{:d}'.format(self.buff_ix))
 
             if self.buff_ix == self.splits[-1]:
@@ -328,7 +390,6 @@ class BackPropagation(object):
     def zero(self):
         """Zero (in the appropriate sense) various estimator arrays."""
         self.estimates[:] = 0
-        self.global_estimates[:] = 0
 
     def setup_output(self, filename):
         est_name = 'back_propagated'
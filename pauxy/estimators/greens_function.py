@@ -33,8 +33,30 @@ def gab(A, B):
     """
     # Todo: check energy evaluation at later point, i.e., if this needs to be
     # transposed. Shouldn't matter for Hubbard model.
-    inv_O = scipy.linalg.inv((A.conj().T).dot(B))
-    GAB = B.dot(inv_O.dot(A.conj().T))
+    AH = A.conj().T
+    GAB = B.dot(numpy.linalg.solve(AH.dot(B), AH))
+    return GAB
+
+def gab_batched(A, B):
+    r"""One-particle Green's function for a batch of determinant pairs.
+
+    Batched version of :func:`gab`, evaluating all linear solves and products
+    in single calls with a leading batch dimension.
+
+    Parameters
+    ----------
+    A : :class:`numpy.ndarray`
+        Bras with shape (nbatch, M, N).
+    B : :class:`numpy.ndarray`
+        Kets with shape (nbatch, M, N).
+
+    Returns
+    -------
+    GAB : :class:`numpy.ndarray`
+        (One minus) the green's functions with shape (nbatch, M, M).
+    """
+    AH = A.conj().transpose(0,2,1)
+    GAB = numpy.matmul(B, numpy.linalg.solve(numpy.matmul(AH, B), AH))
     return GAB
 
 
@@ -68,7 +90,7 @@ def gab_mod(A, B):
         (One minus) the green's function.
     """
     O = numpy.dot(B.T, A.conj())
-    GHalf = numpy.dot(scipy.linalg.inv(O), B.T)
+    GHalf = numpy.linalg.solve(O, B.T)
     G = numpy.dot(A.conj(), GHalf)
     return (G, GHalf)
 
@@ -21,7 +21,8 @@ def local_energy_hubbard_holstein_momentum(system, G, P, Lap, Ghalf=None):
     T[0] = numpy.diag(Dp).dot(system.T[0]).dot(numpy.diag(Dp.T.conj()))
     T[1] = numpy.diag(Dp).dot(system.T[1]).dot(numpy.diag(Dp.T.conj()))
 
-    ke = numpy.sum(T[0] * G[0] + T[1] * G[1])
+    ke = (numpy.dot(T[0].ravel(), G[0].ravel()) +
+          numpy.dot(T[1].ravel(), G[1].ravel()))
 
     sqrttwomw = numpy.sqrt(2.0 * system.m * system.w0)
     assert (system.gamma_lf * system.w0  == system.g * sqrttwomw)
@@ -65,7 +66,13 @@ def local_energy_hubbard_holstein(system, G, X, Lap, Ghalf=None):
     (E_L(phi), T, V): tuple
         Local, kinetic and potential energies of given walker phi.
     """
-    ke = numpy.sum(system.T[0] * G[0] + system.T[1] * G[1])
+    # Matching dtypes avoids casting T on every call.
+    if numpy.iscomplexobj(G):
+        T = system.T_complex
+    else:
+        T = system.T
+    ke = (numpy.dot(T[0].ravel(), G[0].ravel()) +
+          numpy.dot(T[1].ravel(), G[1].ravel()))
 
     if system.symmetric:
         pe = -0.5*system.U*(G[0].trace() + G[1].trace())
@@ -105,7 +112,14 @@ def local_energy_hubbard(system, G, Ghalf=None):
     (E_L(phi), T, V): tuple
         Local, kinetic and potential energies of given walker phi.
     """
-    ke = numpy.sum(system.T[0] * G[0] + system.T[1] * G[1])
+    # Contract flattened arrays directly to avoid forming T*G temporaries.
+    # Matching dtypes avoids casting T on every call.
+    if numpy.iscomplexobj(G):
+        T = system.T_complex
+    else:
+        T = system.T
+    ke = (numpy.dot(T[0].ravel(), G[0].ravel()) +
+          numpy.dot(T[1].ravel(), G[1].ravel()))
     # Todo: Stupid
     if system.symmetric:
         pe = -0.5*system.U*(G[0].trace() + G[1].trace())
@@ -114,6 +128,32 @@ def local_energy_hubbard(system, G, Ghalf=None):
     return (ke + pe, ke, pe)
 
 
+def local_energy_hubbard_batch(system, Gs):
+    r"""Calculate local energies of a batch of walkers for the Hubbard model.
+
+    Parameters
+    ----------
+    system : :class:`Hubbard`
+        System information for the Hubbard model.
+    Gs : :class:`numpy.ndarray`
+        Walkers' "Green's functions", shape (nwalkers, 2, nbasis, nbasis).
+
+    Returns
+    -------
+    (E_L(phi), T, V): tuple
+        Arrays of local, kinetic and potential energies of each walker.
+    """
+    if numpy.iscomplexobj(Gs):
+        T = system.T_complex
+    else:
+        T = system.T
+    nwalkers = Gs.shape[0]
+    ke = numpy.dot(Gs.reshape(nwalkers,-1), T.ravel())
+    diags = Gs.diagonal(axis1=2, axis2=3)
+    pe = system.U * numpy.einsum('wi,wi->w', diags[:,0], diags[:,1])
+
+    return (ke + pe, ke, pe)
+
 def local_energy_hubbard_ghf(system, Gi, weights, denom):
     """Calculate local energy of GHF walker for the Hubbard model.
 
@@ -16,7 +16,8 @@ try:
 except ImportError as e:
     print(e)
 from pauxy.estimators.hubbard import local_energy_hubbard, local_energy_hubbard_ghf,\
-                                     local_energy_hubbard_holstein
+                                     local_energy_hubbard_holstein,\
+                                     local_energy_hubbard_batch
 from pauxy.estimators.greens_function import gab_mod_ovlp, gab_mod
 from pauxy.estimators.generic import (
     local_energy_generic_opt,
@@ -177,6 +178,11 @@ class Mixed(object):
             # When using importance sampling we only need to know the current
             # walkers weight as well as the local energy, the walker's overlap
             # with the trial wavefunction is not needed.
+            batch = (step % self.energy_eval_freq == 0 and self.eval_energy
+                     and psi.walker_type == 'SD' and system.name == "Hubbard")
+            if batch:
+                psi.recompute_greens_function(trial)
+                energies = psi.local_energies(system)
             for i, w in enumerate(psi.walkers):
                 if self.thermal:
                     if self.average_gf:
@@ -209,11 +215,15 @@ class Mixed(object):
                         self.estimates[self.names.edenom] += w.weight
                 else:
                     if step % self.energy_eval_freq == 0:
-                        w.greens_function(trial)
-                        if self.eval_energy:
-                            E, T, V = w.local_energy(system, rchol=trial._rchol, eri=trial._eri, UVT=trial._UVT)
+                        if batch:
+                            (E, T, V) = (energies[0][i], energies[1][i],
+                                         energies[2][i])
                         else:
-                            E, T, V = 0, 0, 0
+                            w.greens_function(trial)
+                            if self.eval_energy:
+                                E, T, V = w.local_energy(system, rchol=trial._rchol, eri=trial._eri, UVT=trial._UVT)
+                            else:
+                                E, T, V = 0, 0, 0
                         self.estimates[self.names.enumer] += w.weight*w.le_oratio*E.real
                         self.estimates[self.names.e1b:self.names.e2b+1] += (
                                 w.weight*w.le_oratio*numpy.array([T,V]).real
@@ -436,6 +446,33 @@ def local_energy(system, G, Ghalf=None,
         else:
             return local_energy_generic_cholesky(system, G)
 
+def local_energy_batch(system, Gs):
+    """Helper routine to compute local energies of a batch of walkers.
+
+    Only implemented for the Hubbard model with UHF style Green's functions.
+    Other systems need the walkers' half rotated Green's functions and the
+    trial's integrals, see :func:`local_energy`.
+
+    Parameters
+    ----------
+    system : system object
+        system object.
+    Gs : :class:`numpy.ndarray`
+        1RDMs of each walker.
+
+    Returns
+    -------
+    (E,T,V) : tuple
+        Arrays of total, one-body and two-body energies.
+    """
+    ghf = (Gs.shape[-1] == 2*system.nbasis)
+    if system.name == "Hubbard" and not ghf:
+        return local_energy_hubbard_batch(system, Gs)
+    else:
+        raise NotImplementedError("Batched local energy evaluation is only "
+                                  "implemented for the Hubbard model with "
+                                  "UHF walkers, not {}.".format(system.name))
+
 def local_energy_multi_det(system, Gi, weights, two_rdm=None, rchol=None):
     weight = 0
     energies = 0
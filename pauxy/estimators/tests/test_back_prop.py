@@ -29,6 +29,27 @@ def test_back_prop():
         est.update_uhf(sys, qmc, trial, walkers, 100)
         est.print_step(comm, comm.size, i, 10)
 
+@pytest.mark.unit
+def test_back_prop_complex_init():
+    sys = UEG({'rs': 2, 'nup': 7, 'ndown': 7, 'ecut': 1.0})
+    bp_opt = {'tau_bp': 1.0, 'nsplit': 4, 'init_walker': True}
+    qmc = dotdict({'dt': 0.05, 'nstblz': 10, 'nwalkers': 1})
+    trial = HartreeFock(sys, {})
+    numpy.random.seed(8)
+    prop = Continuous(sys, trial, qmc)
+    est = BackPropagation(bp_opt, True, 'estimates.0.h5', qmc, sys, trial,
+                          numpy.complex128, prop.BT_BP)
+    walkers = Walkers(sys, trial, qmc, walker_opts={}, nbp=est.nmax, nprop_tot=est.nmax)
+    wlk = walkers.walkers[0]
+    # Real trial wavefunction with complex initial walker.
+    trial.init = trial.psi.copy()
+    trial.psi = trial.psi.real.copy()
+    for i in range(0, est.nmax+1):
+        prop.propagate_walker(wlk, sys, trial, 0)
+        est.update_uhf(sys, qmc, trial, walkers, 100)
+    assert est.phi_bp.dtype == numpy.complex128
+    assert numpy.isfinite(est.estimates).all()
+
 def teardown_module(self):
     cwd = os.getcwd()
     files = ['estimates.0.h5']
@@ -0,0 +1,12 @@
+import numpy
+import pytest
+from pauxy.estimators.greens_function import gab, gab_batched
+
+@pytest.mark.unit
+def test_gab_batched():
+    numpy.random.seed(7)
+    A = numpy.random.random((3,10,4)) + 1j*numpy.random.random((3,10,4))
+    B = numpy.random.random((3,10,4)) + 1j*numpy.random.random((3,10,4))
+    G = gab_batched(A, B)
+    for i in range(3):
+        numpy.testing.assert_allclose(G[i], gab(A[i], B[i]), atol=1e-12)
@@ -0,0 +1,61 @@
+import numpy
+import pytest
+from pauxy.systems.hubbard import Hubbard
+from pauxy.estimators.hubbard import (
+        local_energy_hubbard,
+        local_energy_hubbard_batch,
+        local_energy_hubbard_holstein
+        )
+from pauxy.systems.hubbard_holstein import HubbardHolstein
+from pauxy.estimators.mixed import local_energy_batch
+from pauxy.utils.misc import dotdict
+
+@pytest.mark.unit
+def test_local_energy_hubbard():
+    options = {'nx': 4, 'ny': 4, 'nup': 7, 'ndown': 5, 'U': 4}
+    system = Hubbard(inputs=options)
+    numpy.random.seed(7)
+    shape = (2, system.nbasis, system.nbasis)
+    G = numpy.random.random(shape) + 1j*numpy.random.random(shape)
+    etot, ke, pe = local_energy_hubbard(system, G)
+    ke_ref = numpy.sum(system.T[0]*G[0] + system.T[1]*G[1])
+    pe_ref = system.U * sum(G[0,i,i]*G[1,i,i] for i in range(system.nbasis))
+    assert ke == pytest.approx(ke_ref)
+    assert pe == pytest.approx(pe_ref)
+    assert etot == pytest.approx(ke_ref+pe_ref)
+
+@pytest.mark.unit
+def test_local_energy_hubbard_batch():
+    options = {'nx': 4, 'ny': 4, 'nup': 7, 'ndown': 5, 'U': 4}
+    system = Hubbard(inputs=options)
+    numpy.random.seed(7)
+    shape = (3, 2, system.nbasis, system.nbasis)
+    Gs = numpy.random.random(shape) + 1j*numpy.random.random(shape)
+    etot, ke, pe = local_energy_hubbard_batch(system, Gs)
+    for i, G in enumerate(Gs):
+        ref = local_energy_hubbard(system, G)
+        assert etot[i] == pytest.approx(ref[0])
+        assert ke[i] == pytest.approx(ref[1])
+        assert pe[i] == pytest.approx(ref[2])
+
+@pytest.mark.unit
+def test_local_energy_batch_unsupported():
+    system = dotdict({'name': 'UEG', 'nbasis': 4})
+    Gs = numpy.zeros((2,2,4,4))
+    with pytest.raises(NotImplementedError):
+        local_energy_batch(system, Gs)
+
+@pytest.mark.unit
+def test_local_energy_hubbard_holstein():
+    options = {'nx': 4, 'ny': 1, 'nup': 2, 'ndown': 2, 'U': 4, 'w0': 0.1,
+               'lambda': 1.0}
+    system = HubbardHolstein(options)
+    numpy.random.seed(7)
+    G = numpy.random.random((2,4,4)) + 1j*numpy.random.random((2,4,4))
+    X = numpy.random.random(4)
+    Lap = numpy.random.random(4)
+    for g in [G, G.real.copy()]:
+        (etot, eel, eph) = local_energy_hubbard_holstein(system, g, X, Lap)
+        ke = numpy.sum(system.T*g)
+        pe = system.U * numpy.dot(g[0].diagonal(), g[1].diagonal())
+        assert eel == pytest.approx(ke+pe)
@@ -1,11 +1,12 @@
 import cmath
-import copy
 import numpy
 import math
 import scipy.linalg
-from pauxy.propagation.operations import kinetic_real, local_energy_bound
+from pauxy.propagation.operations import (kinetic_real, kinetic_real_batched,
+                                          local_energy_bound, phaseless_factor)
 from pauxy.utils.fft import fft_wavefunction, ifft_wavefunction
-from pauxy.utils.linalg import reortho
+from pauxy.utils.linalg import reortho, exponentiate_hermitian
+from pauxy.trial_wavefunction.utils import get_trial_conj, get_trial_adjoint
 from pauxy.walkers.multi_ghf import MultiGHFWalker
 from pauxy.walkers.single_det import SingleDetWalker
 
@@ -32,10 +33,10 @@ class Hirsch(object):
             print("# Parsing discrete propagator input options.")
             print("# Using discrete Hubbard--Stratonovich transformation.")
         if trial.type == 'GHF':
-            self.bt2 = scipy.linalg.expm(-0.5*qmc.dt*system.T[0])
+            self.bt2 = exponentiate_hermitian(system.T[0], -0.5*qmc.dt)
         else:
-            self.bt2 = numpy.array([scipy.linalg.expm(-0.5*qmc.dt*system.T[0]),
-                                    scipy.linalg.expm(-0.5*qmc.dt*system.T[1])])
+            self.bt2 = numpy.array([exponentiate_hermitian(system.T[0], -0.5*qmc.dt),
+                                    exponentiate_hermitian(system.T[1], -0.5*qmc.dt)])
         if trial.type == 'GHF' and trial.bp_wfn is not None:
             self.BT_BP = scipy.linalg.block_diag(self.bt2, self.bt2)
             self.back_propagate = back_propagate_ghf
@@ -79,6 +80,7 @@ class Hirsch(object):
         self.auxf = self.auxf * numpy.exp(-0.5*qmc.dt*system.U)
         self.delta = self.auxf - 1
         self.hybrid = False
+        self.batch_kinetic = False
         if self.free_projection:
             self.propagate_walker = self.propagate_walker_free
         else:
@@ -94,10 +96,20 @@ class Hirsch(object):
         else:
             self.calculate_overlap_ratio = calculate_overlap_ratio_single_det
             self.update_greens_function = self.update_greens_function_uhf
+            if single_site:
+                self.two_body = self.two_body_single_site_uhf
+            # With the spin decomposition and a real trial wavefunction and
+            # initial walker the walkers stay real so can be stored, and
+            # propagated, as such.
+            self.real_walkers = (not self.charge_decomp and
+                                 not self.free_projection and
+                                 not trial.psi.imag.any() and
+                                 not trial.init.imag.any())
             if self.ffts:
                 self.kinetic = kinetic_kspace
             else:
                 self.kinetic = kinetic_real
+                self.batch_kinetic = not self.free_projection
         if verbose:
             print ("# Finished setting up propagator.")
 
@@ -118,11 +130,11 @@ class Hirsch(object):
         nup : int
             Number of up electrons.
         """
-        vup = trial.psi.conj()[i,:nup]
+        vup = trial.psi[i,:nup].conj()
         uup = walker.phi[i,:nup]
         q = numpy.dot(walker.inv_ovlp[0].T, uup)
         walker.G[0][i,i] = numpy.dot(vup,q)
-        vdown = trial.psi.conj()[i,nup:]
+        vdown = trial.psi[i,nup:].conj()
         udown = walker.phi[i,nup:]
         q = numpy.dot(walker.inv_ovlp[1].T, udown)
         walker.G[1][i,i] = numpy.dot(vdown, q)
@@ -161,13 +173,68 @@ class Hirsch(object):
         walker.inverse_overlap(trial)
         # Update walker weight
         ot_new = walker.calc_otrial(trial)
-        ratio = (ot_new/walker.ot)
-        phase = cmath.phase(ratio)
-        if abs(phase) < 0.5*math.pi:
-            walker.weight = walker.weight * ratio.real
+        wfac = phaseless_factor(ot_new/walker.ot)
+        walker.weight = walker.weight * wfac
+        if wfac > 0:
             walker.ot = ot_new
+
+    def kinetic_importance_sampling_batched(self, walkers, idx, system, trial):
+        r"""Propagate a set of walkers by the kinetic term.
+
+        Same as :meth:`kinetic_importance_sampling` but acts on all selected
+        walkers with a single matrix multiplication per spin. If the walker
+        handler stores the walkers contiguously the update is applied to
+        phi_all directly.
+
+        Parameters
+        ----------
+        walkers : :class:`pauxy.walkers.handler.Walkers`
+            Walker handler. Walkers are updated inplace.
+        idx : :class:`numpy.ndarray`
+            Indices of the walkers to propagate.
+        system : :class:`pauxy.system.System`
+            System object.
+        trial : :class:`pauxy.trial_wavefunctioin.Trial`
+            Trial wavefunction object.
+        """
+        if len(idx) == 0:
+            return
+        active = [walkers.walkers[i] for i in idx]
+        full = len(idx) == len(walkers.walkers)
+        if walkers.phi_all is None:
+            phis = numpy.array([w.phi for w in active])
+        elif full:
+            phis = walkers.phi_all
         else:
-            walker.weight = 0.0
+            phis = walkers.phi_all[idx]
+        kinetic_real_batched(phis, system, self.bt2)
+        if walkers.phi_all is None:
+            for (i, w) in enumerate(active):
+                w.phi[:] = phis[i]
+        elif not full:
+            walkers.phi_all[idx] = phis
+        # Inverse overlap matrices of all walkers in one call per spin.
+        nup = system.nup
+        psiH = get_trial_adjoint(trial, real=active[0].is_real())
+        inv_up = numpy.linalg.inv(numpy.matmul(psiH[:nup], phis[:,:,:nup]))
+        if system.ndown > 0:
+            inv_dn = numpy.linalg.inv(numpy.matmul(psiH[nup:], phis[:,:,nup:]))
+        else:
+            inv_dn = numpy.zeros(inv_up.shape)
+        if walkers.inv_ovlp_all is not None:
+            # Walkers' inverse overlap matrices are views into these arrays.
+            walkers.inv_ovlp_all[0][idx] = inv_up
+            walkers.inv_ovlp_all[1][idx] = inv_dn
+        else:
+            for (i, w) in enumerate(active):
+                w.set_inv_ovlp(inv_up[i], inv_dn[i])
+        ot_old = numpy.array([w.ot for w in active])
+        ot_new = numpy.array([w.calc_otrial(trial) for w in active])
+        wfac = phaseless_factor(ot_new/ot_old)
+        for (i, w) in enumerate(active):
+            w.weight = w.weight * wfac[i]
+            if wfac[i] > 0:
+                w.ot = ot_new[i]
 
     def two_body_single_site(self, walker, system, trial):
         r"""Propagate by potential term using discrete HS transform.
@@ -187,6 +254,7 @@ class Hirsch(object):
         nup = system.nup
         soffset = walker.phi.shape[0] - system.nbasis
         # walker.greens_function_fast(trial)
+        rands = numpy.random.random(system.nbasis)
         for i in range(0, system.nbasis):
             # Compute Gii here to avoid need to recompute GF after KE
             # propagation. We need Gii to include contributions from previous
@@ -199,7 +267,7 @@ class Hirsch(object):
             # issues here with complex numbers?
             phaseless_ratio = numpy.maximum(probs.real, [0,0])
             norm = sum(phaseless_ratio)
-            r = numpy.random.random()
+            r = rands[i]
             # Is this necessary?
             if norm > 0:
                 walker.weight = walker.weight * norm
@@ -209,8 +277,8 @@ class Hirsch(object):
                     xi = 1
                 vtup = walker.phi[i,:nup] * delta[xi, 0]
                 vtdown = walker.phi[i+soffset,nup:] * delta[xi, 1]
-                walker.phi[i,:nup] = walker.phi[i,:nup] + vtup
-                walker.phi[i+soffset,nup:] = walker.phi[i+soffset,nup:] + vtdown
+                walker.phi[i,:nup] += vtup
+                walker.phi[i+soffset,nup:] += vtdown
                 walker.update_overlap(probs, xi, trial.coeffs)
                 if walker.field_configs is not None:
                     walker.field_configs.push(xi)
@@ -219,6 +287,38 @@ class Hirsch(object):
                 walker.weight = 0
                 return
 
+    def two_body_single_site_uhf(self, walker, system, trial):
+        r"""Propagate by potential term using discrete HS transform.
+
+        Specialised version of two_body_single_site for single determinant
+        walkers which works directly on the walker's arrays. Walkers stored as
+        real arrays are propagated in real arithmetic.
+
+        Parameters
+        ----------
+        walker : :class:`pauxy.walkers.SingleDetWalker` object
+            Walker object to be updated. On output we have acted on phi by
+            B_V(x) and updated the weight appropriately. Updates inplace.
+        system : :class:`pauxy.system.System`
+            System object.
+        trial : :class:`pauxy.trial_wavefunctioin.Trial`
+            Trial wavefunction object.
+        """
+        rands = numpy.random.random(system.nbasis)
+        psi_conj = get_trial_conj(trial, real=walker.is_real())
+        (fields, wfac, ofac, alive) = (
+                single_site_sweep_uhf(walker.phi, walker.inv_ovlp, walker.G,
+                                      psi_conj, self.delta, self.aux_wfac,
+                                      rands, system.nup)
+        )
+        if walker.field_configs is not None:
+            walker.field_configs.push_many(fields)
+        walker.ot = walker.ot * ofac
+        if alive:
+            walker.weight = walker.weight * wfac
+        else:
+            walker.weight = 0
+
     def two_body_direct(self, walker, system, trial):
         r"""Propagate by potential term using discrete HS transform.
 
@@ -238,32 +338,21 @@ class Hirsch(object):
         # fields = numpy.random.randint(2, size=system.nbasis)
         walker.greens_function(trial)
         nia, nib = walker.G[0].diagonal(), walker.G[1].diagonal()
-        fields = []
-        fb_fac = 1.0
         if self.charge_decomp:
             fb_term = nia + nib - 1
         else:
             fb_term = nia - nib
-        for i in range(system.nbasis):
-            pp = 0.5*numpy.exp(self.gamma*fb_term[i]).real
-            pm = 0.5*numpy.exp(-self.gamma*fb_term[i]).real
-            norm = pp + pm
-            r = numpy.random.random()
-            if r < pp/norm:
-                fields.append(0)
-                fb_fac *= 0.5 * norm * numpy.exp(-self.gamma*fb_term[i]).real
-            else:
-                fields.append(1)
-                fb_fac *= 0.5 * norm * numpy.exp(self.gamma*fb_term[i]).real
-
-        BVa = numpy.diag([self.auxf[xi,0] for xi in fields])
-        BVb = numpy.diag([self.auxf[xi,1] for xi in fields])
-        walker.phi[:,:nup] = numpy.dot(BVa, walker.phi[:,:nup])
-        walker.phi[:,nup:] = numpy.dot(BVb, walker.phi[:,nup:])
+        # Sample all fields for the sweep at once.
+        pp = 0.5*numpy.exp(self.gamma*fb_term).real
+        pm = 0.5*numpy.exp(-self.gamma*fb_term).real
+        norm = pp + pm
+        rands = numpy.random.random(system.nbasis)
+        fields = (rands >= pp/norm).astype(numpy.int32)
+        fb_fac = numpy.prod(norm*numpy.where(fields==0, pm, pp))
+        walker.phi[:,:nup] *= self.auxf[fields,0][:,None]
+        walker.phi[:,nup:] *= self.auxf[fields,1][:,None]
         ovlp = walker.calc_overlap(trial)
-        wfac = 1.0 + 0j
-        for xi in fields:
-            wfac *= self.aux_wfac[xi]
+        wfac = numpy.prod(self.aux_wfac[fields]) + 0j
         ratio = wfac * ovlp / walker.ot
         phase = cmath.phase(ratio)
         if abs(phase) < 0.5*math.pi:
@@ -300,6 +389,42 @@ class Hirsch(object):
             self.kinetic_importance_sampling(walker, system, trial)
         walker.weight *= numpy.exp(self.dt*eshift)
 
+    def propagate_walkers(self, walkers, system, trial, eshift):
+        r"""Propagate all walkers with non-zero weight by one time step.
+
+        When possible the kinetic half steps are applied to all walkers at
+        once, otherwise this falls back to :meth:`propagate_walker`.
+
+        Parameters
+        ----------
+        walkers : :class:`pauxy.walkers.handler.Walkers`
+            Walker handler. Walkers are updated inplace.
+        system : :class:`pauxy.system.System`
+            System object.
+        trial : :class:`pauxy.trial_wavefunctioin.Trial`
+            Trial wavefunction object.
+        eshift : float
+            Energy shift.
+        """
+        weights = numpy.array([abs(w.weight) for w in walkers.walkers])
+        idx = numpy.flatnonzero(weights > 1e-8)
+        if not self.batch_kinetic:
+            for i in idx:
+                self.propagate_walker(walkers.walkers[i], system, trial,
+                                      eshift)
+            return
+        self.kinetic_importance_sampling_batched(walkers, idx, system, trial)
+        for i in idx:
+            w = walkers.walkers[i]
+            if abs(w.weight) > 0:
+                self.two_body(w, system, trial)
+        alive = [i for i in idx if abs(walkers.walkers[i].weight.real) > 0]
+        self.kinetic_importance_sampling_batched(walkers,
+                                                 numpy.array(alive, dtype=int),
+                                                 system, trial)
+        for i in idx:
+            walkers.walkers[i].weight *= numpy.exp(self.dt*eshift)
+
     def propagate_walker_free(self, walker, system, trial, eshift=0):
         r"""Propagate walker without imposing constraint.
 
@@ -316,21 +441,13 @@ class Hirsch(object):
             Trial wavefunction object.
         """
         kinetic_real(walker.phi, system, self.bt2)
-        delta = self.delta
         nup = system.nup
         wfac = 1.0
-        for i in range(0, system.nbasis):
-            if abs(walker.weight) > 0:
-                r = numpy.random.random()
-                if r < 0.5:
-                    xi = 0
-                else:
-                    xi = 1
-                vtup = walker.phi[i,:nup] * delta[xi, 0]
-                vtdown = walker.phi[i,nup:] * delta[xi, 1]
-                walker.phi[i,:nup] = walker.phi[i,:nup] + vtup
-                walker.phi[i,nup:] = walker.phi[i,nup:] + vtdown
-                wfac *= self.aux_wfac[xi]
+        if abs(walker.weight) > 0:
+            fields = (numpy.random.random(system.nbasis) >= 0.5).astype(numpy.int32)
+            walker.phi[:system.nbasis,:nup] *= self.auxf[fields, 0][:,None]
+            walker.phi[:system.nbasis,nup:] *= self.auxf[fields, 1][:,None]
+            wfac = numpy.prod(self.aux_wfac[fields])
         kinetic_real(walker.phi, system, self.bt2)
         walker.inverse_overlap(trial)
         # Update walker weight
@@ -550,6 +667,94 @@ def calculate_overlap_ratio_single_det(walker, delta, trial, i):
     R2 = (1+delta[1][0]*walker.G[0][i,i])*(1+delta[1][1]*walker.G[1][i,i])
     return 0.5 * numpy.array([R1,R2])
 
+def single_site_sweep_uhf(phi, inv_ovlp, G, psi_conj, delta, aux_wfac, rands,
+                          nup):
+    """Sweep over lattice sites sampling the discrete auxiliary fields.
+
+    Kernel for the single-site update of a single determinant walker. The
+    walker's wavefunction, inverse overlap matrices and the diagonal of its
+    Green's function are updated in place.
+
+    Parameters
+    ----------
+    phi : :class:`numpy.ndarray`
+        Walker's wavefunction.
+    inv_ovlp : list
+        Inverse overlap matrices for each spin. Updated inplace.
+    G : :class:`numpy.ndarray`
+        Walker's Green's function. Only the diagonal is updated.
+    psi_conj : :class:`numpy.ndarray`
+        Complex conjugate of the trial wavefunction.
+    delta : :class:`numpy.ndarray`
+        Delta updates for single spin flip.
+    aux_wfac : :class:`numpy.ndarray`
+        Weight factors for each field (charge decomposition).
+    rands : :class:`numpy.ndarray`
+        Uniform random numbers, one per site.
+    nup : int
+        Number of up electrons.
+
+    Returns
+    -------
+    fields : :class:`numpy.ndarray`
+        Fields selected at each site visited.
+    wfac : float
+        Product of the normalisation factors for each site.
+    ofac : float / complex
+        Ratio of new to old overlap with the trial wavefunction.
+    alive : bool
+        False if the walker was killed during the sweep.
+    """
+    nbasis = len(rands)
+    fields = numpy.zeros(nbasis, dtype=numpy.int32)
+    wfac = 1.0
+    ofac = 1.0
+    # Unpack constants so the field selection below is purely scalar.
+    (d0u, d0d), (d1u, d1d) = delta
+    # Row scale factors (1 + delta) and ratio prefactors for each field.
+    scale = 1.0 + delta
+    (h0, h1) = 0.5 * numpy.asarray(aux_wfac)
+    for i in range(nbasis):
+        # Compute Gii here to account for previous sites' updates. The row
+        # vector phi_i^T A^{-1} is reused in the Sherman-Morrison update below.
+        pinv_up = phi[i,:nup].dot(inv_ovlp[0])
+        pinv_dn = phi[i,nup:].dot(inv_ovlp[1])
+        psi_up = psi_conj[i,:nup]
+        psi_dn = psi_conj[i,nup:]
+        gup = pinv_up.dot(psi_up)
+        gdn = pinv_dn.dot(psi_dn)
+        G[0,i,i] = gup
+        G[1,i,i] = gdn
+        # Ratio of determinants for the two choices of auxilliary fields.
+        r0u = 1 + d0u*gup
+        r0d = 1 + d0d*gdn
+        r1u = 1 + d1u*gup
+        r1d = 1 + d1d*gdn
+        p0 = r0u * r0d * h0
+        p1 = r1u * r1d * h1
+        pr0 = max(p0.real, 0.0)
+        norm = pr0 + max(p1.real, 0.0)
+        if norm <= 0:
+            return (fields[:i], wfac, ofac, False)
+        wfac *= norm
+        if rands[i] < pr0/norm:
+            (xi, ratio, rup, rdn) = (0, p0, r0u, r0d)
+        else:
+            (xi, ratio, rup, rdn) = (1, p1, r1u, r1d)
+        phi[i,:nup] *= scale[xi,0]
+        phi[i,nup:] *= scale[xi,1]
+        ofac *= 2 * ratio
+        # Sherman-Morrison update with u = psi_i^*, v^T = delta phi_i, for
+        # which the denominator 1 + v^T A^{-1} u = 1 + delta G_ii.
+        inv_ovlp[0] -= (
+                numpy.outer(inv_ovlp[0].dot(psi_up), delta[xi,0]*pinv_up) / rup
+        )
+        inv_ovlp[1] -= (
+                numpy.outer(inv_ovlp[1].dot(psi_dn), delta[xi,1]*pinv_dn) / rdn
+        )
+        fields[i] = xi
+    return (fields, wfac, ofac, True)
+
 def calculate_overlap_ratio_single_det_charge(walker, delta, trial, i):
     """Calculate overlap ratio for single site update with UHF trial.
 
@@ -748,7 +953,7 @@ def back_propagate_single(phi_in, configs, weights,
             (phi_in[:,:nup], R) = reortho(phi_in[:,:nup])
             (phi_in[:,nup:], R) = reortho(phi_in[:,nup:])
         if store:
-            psi_store.append(copy.deepcopy(phi_in))
+            psi_store.append(phi_in.copy())
 
     return psi_store
 
@@ -792,7 +997,7 @@ def back_propagate_single_ghf(phi, configs, weights, system,
                 (phi[idet], detR) = reortho(psi_i)
                 weights[idet] *= detR.conjugate()
         if store:
-            psi_store.append(copy.deepcopy(phi))
+            psi_store.append(phi.copy())
 
     return psi_store
 
@@ -1,11 +1,10 @@
 import cmath
-import copy
 import numpy
 import math
 import scipy.linalg
 from pauxy.propagation.operations import kinetic_real, local_energy_bound
 from pauxy.utils.fft import fft_wavefunction, ifft_wavefunction
-from pauxy.utils.linalg import reortho
+from pauxy.utils.linalg import reortho, exponentiate_hermitian
 from pauxy.walkers.multi_ghf import MultiGHFWalker
 from pauxy.walkers.single_det import SingleDetWalker
 from pauxy.trial_wavefunction.harmonic_oscillator import HarmonicOscillator, HarmonicOscillatorMomentum
@@ -38,10 +37,10 @@ class HirschDMC(object):
             print("# Using discrete Hubbard--Stratonovich transformation.")
             
         if trial.type == 'GHF':
-            self.bt2 = scipy.linalg.expm(-0.5*qmc.dt*system.T[0])
+            self.bt2 = exponentiate_hermitian(system.T[0], -0.5*qmc.dt)
         else:
-            self.bt2 = numpy.array([scipy.linalg.expm(-0.5*qmc.dt*system.T[0]),
-                                    scipy.linalg.expm(-0.5*qmc.dt*system.T[1])])
+            self.bt2 = numpy.array([exponentiate_hermitian(system.T[0], -0.5*qmc.dt),
+                                    exponentiate_hermitian(system.T[1], -0.5*qmc.dt)])
 
         if trial.type == 'GHF' and trial.bp_wfn is not None:
             self.BT_BP = scipy.linalg.block_diag(self.bt2, self.bt2)
@@ -167,11 +166,11 @@ class HirschDMC(object):
 
         ndown = walker.phi.shape[1] - nup
 
-        vup = trial.psi.conj()[i,:nup]
+        vup = trial.psi[i,:nup].conj()
         uup = walker.phi[i,:nup]
         q = numpy.dot(walker.inv_ovlp[0], vup)
         walker.G[0][i,i] = numpy.dot(uup, q)
-        vdown = trial.psi.conj()[i,nup:]
+        vdown = trial.psi[i,nup:].conj()
         udown = walker.phi[i,nup:]
         if (ndown > 0):
             q = numpy.dot(walker.inv_ovlp[1], vdown)
@@ -199,7 +198,7 @@ class HirschDMC(object):
 
             for ix in range(trial.nperms):
                 psi = trial.psi[ix,:,:].copy()
-                vup = psi.conj()[i,:nup]
+                vup = psi[i,:nup].conj()
 
                 uup = walker.phi[i,:nup]
 
@@ -207,7 +206,7 @@ class HirschDMC(object):
 
                 walker.Gi[ix,0,i,i] = numpy.dot(uup, q)
                 
-                vdown = psi.conj()[i,nup:]
+                vdown = psi[i,nup:].conj()
                 udown = walker.phi[i,nup:]
 
                 if (ndown > 0):
@@ -217,7 +216,7 @@ class HirschDMC(object):
         else:
             for ix, perm in enumerate(trial.perms):
                 psi = trial.psi[perm,:].copy()
-                vup = psi.conj()[i,:nup]
+                vup = psi[i,:nup].conj()
 
                 uup = walker.phi[i,:nup]
 
@@ -225,7 +224,7 @@ class HirschDMC(object):
 
                 walker.Gi[ix,0,i,i] = numpy.dot(uup, q)
                 
-                vdown = psi.conj()[i,nup:]
+                vdown = psi[i,nup:].conj()
                 udown = walker.phi[i,nup:]
 
                 if (ndown > 0):
@@ -265,6 +264,7 @@ class HirschDMC(object):
         delta = self.delta
         nup = system.nup
         soffset = walker.phi.shape[0] - system.nbasis
+        rands = numpy.random.random(system.nbasis)
         for i in range(0, system.nbasis):
             self.update_greens_function(walker, trial, i, nup)
             # Ratio of determinants for the two choices of auxilliary fields
@@ -280,7 +280,7 @@ class HirschDMC(object):
             # issues here with complex numbers?
             phaseless_ratio = numpy.maximum(probs.real, [0,0])
             norm = sum(phaseless_ratio)
-            r = numpy.random.random()
+            r = rands[i]
             # Is this necessary?
             # todo : mirror correction
             if norm > 0:
@@ -291,8 +291,8 @@ class HirschDMC(object):
                     xi = 1
                 vtup = walker.phi[i,:nup] * delta[xi, 0]
                 vtdown = walker.phi[i+soffset,nup:] * delta[xi, 1]
-                walker.phi[i,:nup] = walker.phi[i,:nup] + vtup
-                walker.phi[i+soffset,nup:] = walker.phi[i+soffset,nup:] + vtdown
+                walker.phi[i,:nup] += vtup
+                walker.phi[i+soffset,nup:] += vtdown
                 walker.update_overlap(probs, xi, trial.coeffs)
                 if walker.field_configs is not None:
                     walker.field_configs.push(xi)
@@ -482,21 +482,13 @@ class HirschDMC(object):
         Veph = [numpy.diag( numpy.exp(const * walker.X) ),numpy.diag( numpy.exp(const * walker.X) )]
         kinetic_real(walker.phi, system, Veph, H1diag=True)
 
-        delta = self.delta
         nup = system.nup
-        for i in range(0, system.nbasis):
-            if abs(walker.weight) > 0:
-                r = numpy.random.random()
-                if r < 0.5:
-                    xi = 0
-                else:
-                    xi = 1
-                vtup = walker.phi[i,:nup] * delta[xi, 0]
-                vtdown = walker.phi[i,nup:] * delta[xi, 1]
-                walker.phi[i,:nup] = walker.phi[i,:nup] + vtup
-                walker.phi[i,nup:] = walker.phi[i,nup:] + vtdown
-                if (self.charge):
-                    walker.weight *= self.charge_factor[xi]
+        if abs(walker.weight) > 0:
+            fields = (numpy.random.random(system.nbasis) >= 0.5).astype(numpy.int32)
+            walker.phi[:system.nbasis,:nup] *= self.auxf[fields, 0][:,None]
+            walker.phi[:system.nbasis,nup:] *= self.auxf[fields, 1][:,None]
+            if (self.charge):
+                walker.weight *= numpy.prod(self.charge_factor[fields])
         
         kinetic_real(walker.phi, system, Veph, H1diag=True)
 
@@ -762,7 +754,7 @@ def back_propagate_single(phi_in, configs, weights,
             (phi_in[:,:nup], R) = reortho(phi_in[:,:nup])
             (phi_in[:,nup:], R) = reortho(phi_in[:,nup:])
         if store:
-            psi_store.append(copy.deepcopy(phi_in))
+            psi_store.append(phi_in.copy())
 
     return psi_store
 
@@ -806,7 +798,7 @@ def back_propagate_single_ghf(phi, configs, weights, system,
                 (phi[idet], detR) = reortho(psi_i)
                 weights[idet] *= detR.conjugate()
         if store:
-            psi_store.append(copy.deepcopy(phi))
+            psi_store.append(phi.copy())
 
     return psi_store
 
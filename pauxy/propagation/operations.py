@@ -51,6 +51,29 @@ def kinetic_real(phi, system, bt2, H1diag=False):
         phi[:,:nup] = bt2[0].dot(phi[:,:nup])
         phi[:,nup:] = bt2[1].dot(phi[:,nup:])
 
+def kinetic_real_batched(phis, system, bt2):
+    r"""Propagate a stack of walkers by the kinetic term.
+
+    Equivalent to calling :func:`kinetic_real` on each walker but uses a
+    single matrix multiplication per spin for the whole stack.
+
+    Parameters
+    ----------
+    phis : :class:`numpy.ndarray`
+        Walker wavefunctions of shape (nwalkers, nbasis, nup+ndown). Updated
+        inplace.
+    system : :class:`pauxy.system.System`
+        System object.
+    bt2 : :class:`numpy.ndarray`
+        One-body propagator for each spin.
+    """
+    nw, nbasis, ne = phis.shape
+    nup = system.nup
+    for (s, b) in zip([slice(0,nup), slice(nup,ne)], bt2):
+        nel = phis[:,:,s].shape[-1]
+        stack = phis[:,:,s].transpose(1,0,2).reshape(nbasis, nw*nel)
+        phis[:,:,s] = b.dot(stack).reshape(nbasis, nw, nel).transpose(1,0,2)
+
 def kinetic_real_stochastic(phi, system, bt2, nsamples, H1diag=False):
     r"""Propagate by the kinetic term by direct matrix multiplication.
 
@@ -116,6 +139,26 @@ def local_energy_bound(local_energy, mean, threshold):
 
     return local_energy
 
+def phaseless_factor(ratio):
+    """Weight factor from an overlap ratio under the phaseless constraint.
+
+    Re(ratio) > 0 is equivalent to |arg(ratio)| < pi/2, so the factor is
+    computed without a branch and applies elementwise to arrays of ratios.
+
+    Parameters
+    ----------
+    ratio : complex or :class:`numpy.ndarray`
+        Ratio of new to old overlap with the trial wavefunction.
+
+    Returns
+    -------
+    factor : float or :class:`numpy.ndarray`
+        Re(ratio) if the constraint is satisfied, zero otherwise (including
+        for NaN ratios).
+    """
+    # fmax returns the non-NaN argument, so an invalid overlap kills the walker.
+    return numpy.fmax(numpy.real(ratio), 0.0)
+
 def kinetic_ghf(phi, system, bt2):
     r"""Propagate by the kinetic term by direct matrix multiplication.
 
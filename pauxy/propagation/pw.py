@@ -150,7 +150,7 @@ class PW(object):
 
             expVphi += Vphi_grid[system.gmap,:]
 
-        walker.phi = expVphi.copy()
+        numpy.copyto(walker.phi, expVphi)
 
         return (cmf, cfb, xshifted)
 
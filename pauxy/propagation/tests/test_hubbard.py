@@ -9,6 +9,7 @@ from pauxy.walkers.handler import Walkers
 from pauxy.walkers.single_det import SingleDetWalker
 from pauxy.utils.misc import dotdict
 from pauxy.estimators.greens_function import gab
+from pauxy.propagation.operations import phaseless_factor
 
 options = {'nx': 4, 'ny': 4, 'nup': 8, 'ndown': 8, 'U': 4}
 system = Hubbard(inputs=options)
@@ -82,6 +83,64 @@ def test_update_greens_function():
         assert guu[i,i] == pytest.approx(walker.G[0,i,i])
         assert gdd[i,i] == pytest.approx(walker.G[1,i,i])
 
+@pytest.mark.unit
+def test_hubbard_real_sweep():
+    qmc = dotdict({'dt': 0.01, 'nstblz': 5})
+    prop = Hirsch(system, trial, qmc)
+    assert prop.real_walkers
+    walker = SingleDetWalker(system, trial, walker_opts={'real': True},
+                             nbp=1, nprop_tot=1)
+    assert walker.phi.dtype == numpy.float64
+    numpy.random.seed(7)
+    prop.propagate_walker(walker, system, trial, 0.0)
+    assert walker.phi.dtype == numpy.float64
+    assert walker.inv_ovlp[0].dtype == numpy.float64
+    walker_ref = SingleDetWalker(system, trial, nbp=1, nprop_tot=1)
+    numpy.random.seed(7)
+    prop.propagate_walker(walker_ref, system, trial, 0.0)
+    numpy.testing.assert_allclose(walker.phi, walker_ref.phi, atol=1e-14)
+    numpy.testing.assert_allclose(walker.inv_ovlp[0], walker_ref.inv_ovlp[0],
+                                  atol=1e-12)
+    assert walker.ot == pytest.approx(walker_ref.ot)
+    assert walker.weight == pytest.approx(walker_ref.weight)
+    # A complex initial walker must not be truncated to its real part.
+    trial_cplx = MultiSlater(system, (coeffs, wfn))
+    trial_cplx.psi = trial_cplx.psi[0]
+    trial_cplx.init = trial_cplx.init * numpy.exp(0.1j)
+    prop = Hirsch(system, trial_cplx, qmc)
+    assert not prop.real_walkers
+
+@pytest.mark.unit
+def test_hubbard_propagate_walkers():
+    qmc = dotdict({'dt': 0.01, 'nstblz': 5, 'nwalkers': 4,
+                   'ntot_walkers': 4})
+    prop = Hirsch(system, trial, qmc)
+    assert prop.batch_kinetic
+    walkers = Walkers(system, MultiSlater(system, (coeffs, wfn)), qmc,
+                      nbp=5, nprop_tot=5)
+    assert walkers.phi_all is not None
+    assert walkers.inv_ovlp_all is not None
+    walkers_ref = Walkers(system, MultiSlater(system, (coeffs, wfn)), qmc,
+                          nbp=5, nprop_tot=5)
+    # Dead walkers are skipped.
+    walkers.walkers[2].weight = 0.0
+    numpy.random.seed(7)
+    for i in range(5):
+        prop.propagate_walkers(walkers, system, trial, 0.1)
+    numpy.random.seed(7)
+    for i in range(5):
+        for w in walkers_ref.walkers[:2] + walkers_ref.walkers[3:]:
+            prop.propagate_walker(w, system, trial, 0.1)
+    numpy.testing.assert_allclose(walkers.walkers[2].phi,
+                                  walkers_ref.walkers[2].phi)
+    for i in [0, 1, 3]:
+        (w, wr) = (walkers.walkers[i], walkers_ref.walkers[i])
+        numpy.testing.assert_allclose(w.phi, wr.phi, atol=1e-12)
+        numpy.testing.assert_allclose(walkers.inv_ovlp_all[1][i],
+                                      wr.inv_ovlp[1], atol=1e-10)
+        assert w.ot == pytest.approx(wr.ot)
+        assert w.weight == pytest.approx(wr.weight)
+
 @pytest.mark.unit
 def test_hubbard_charge():
     options = {'nx': 4, 'ny': 4, 'nup': 8, 'ndown': 8, 'U': 4}
@@ -279,3 +338,11 @@ def test_hubbard_ortho():
     # pl.legend()
     # pl.show()
 
+
+@pytest.mark.unit
+def test_phaseless_factor():
+    ratios = numpy.array([0.5+0.1j, -0.5+0.1j, complex(numpy.nan, 0.0),
+                          complex(0.0, numpy.nan)])
+    fac = phaseless_factor(ratios)
+    assert numpy.allclose(fac, [0.5, 0.0, 0.0, 0.0])
+    assert phaseless_factor(complex(numpy.nan, numpy.nan)) == 0.0
@@ -153,6 +153,8 @@ class AFQMC(object):
         wlk_opts = get_input_value(options, 'walkers', default={},
                                    alias=['walker', 'walker_opts'],
                                    verbose=self.verbosity>1)
+        # Store walkers as real arrays if the propagator keeps them real.
+        wlk_opts['real'] = getattr(self.propagators, 'real_walkers', False)
         est_opts = get_input_value(options, 'estimators', default={},
                                    alias=['estimates','estimator'],
                                    verbose=self.verbosity>1)
@@ -228,10 +230,15 @@ class AFQMC(object):
                                        self.propagators.free_projection)
                 self.tortho += time.time() - start
             start = time.time()
+            if hasattr(self.propagators, 'propagate_walkers'):
+                self.propagators.propagate_walkers(self.psi, self.system,
+                                                   self.trial, eshift)
+            else:
+                for w in self.psi.walkers:
+                    if abs(w.weight) > 1e-8:
+                        self.propagators.propagate_walker(w, self.system,
+                                                          self.trial, eshift)
             for w in self.psi.walkers:
-                if abs(w.weight) > 1e-8:
-                    self.propagators.propagate_walker(w, self.system,
-                                                      self.trial, eshift)
                 if (abs(w.weight) > w.total_weight * 0.10) and step > 1:
                     w.weight = w.total_weight * 0.10
             self.tprop += time.time() - start
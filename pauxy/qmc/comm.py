@@ -22,7 +22,9 @@ class FakeComm:
     def recv(self, source=None, root=0):
         pass
     def Reduce(self, sendbuf, recvbuf, op=None):
-        recvbuf[:] = sendbuf
+        # sendbuf is None for an in place reduction.
+        if sendbuf is not None:
+            recvbuf[:] = sendbuf
 
 class FakeReq:
 
@@ -87,6 +87,8 @@ class Hubbard(object):
             self.T = kinetic(self.t, self.nbasis, self.nx,
                              self.ny, self.ktwist, xpbc=self.xpbc, ypbc=self.ypbc)
         self.H1 = self.T
+        # Complex copy for contracting with walker Green's functions.
+        self.T_complex = self.T.astype(numpy.complex128)
         self.Text = scipy.linalg.block_diag(self.T[0], self.T[1])
         self.P = transform_matrix(self.nbasis, self.kpoints,
                                   self.kc, self.nx, self.ny)
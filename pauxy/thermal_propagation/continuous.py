@@ -140,16 +140,9 @@ class Continuous(object):
         # JOONHO: exact exponential
         # copy = numpy.copy(phi)
         # phi = scipy.linalg.expm(VHS).dot(copy)
-        phi = numpy.identity(VHS.shape[0], dtype = numpy.complex128)
         if debug:
-            copy = numpy.copy(phi)
-            c2 = scipy.linalg.expm(VHS).dot(copy)
-
-        Temp = numpy.identity(VHS.shape[0], dtype = numpy.complex128)
-
-        for n in range(1, self.exp_nmax+1):
-            Temp = VHS.dot(Temp) / n
-            phi += Temp
+            c2 = scipy.linalg.expm(VHS)
+        phi = exponentiate_matrix(VHS, self.exp_nmax)
         if debug:
             print("DIFF: {: 10.8e}".format((c2 - phi).sum() / c2.size))
         return phi
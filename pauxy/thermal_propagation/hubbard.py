@@ -115,11 +115,12 @@ class ThermalDiscrete(object):
         return sum(oratio)
 
     def propagate_walker_constrained(self, system, walker, time_slice, eshift=0):
+        rands = numpy.random.random(system.nbasis)
         for i in range(0, system.nbasis):
             probs = self.calculate_overlap_ratio(walker, i)
             phaseless_ratio = numpy.maximum(probs.real, [0,0])
             norm = sum(phaseless_ratio)
-            r = numpy.random.random()
+            r = rands[i]
             if norm > 0:
                 walker.weight = walker.weight * norm * numpy.exp(eshift)
                 # if walker.weight > walker.total_weight * 0.10:
@@ -133,7 +134,7 @@ class ThermalDiscrete(object):
                 self.BV[1,i] = self.auxf[xi, 1]
             else:
                 walker.weight = 0
-        B = numpy.einsum('ki,kij->kij', self.BV, self.BH1)
+        B = self.BV[:,:,None] * self.BH1
         walker.stack.update(B)
         # Need to recompute Green's function from scratch before we propagate it
         # to the next time slice due to stack structure.
@@ -143,10 +144,9 @@ class ThermalDiscrete(object):
 
     def propagate_walker_free(self, system, walker, time_slice, eshift):
         fields = numpy.random.randint(0, 2, system.nbasis)
-        self.BV[0] = numpy.array([self.auxf[xi,0] for xi in fields])
-        self.BV[1] = numpy.array([self.auxf[xi,1] for xi in fields])
+        self.BV[:] = self.auxf[fields].T
         # Vsii Tsij
-        B = numpy.einsum('ki,kij->kij', self.BV, self.BH1)
+        B = self.BV[:,:,None] * self.BH1
         wfac = 1.0 + 0j
         for xi in fields:
             wfac *= self.aux_wfac[xi]
@@ -9,6 +9,62 @@ from pauxy.trial_wavefunction.multi_slater import MultiSlater
 from pauxy.utils.io import read_qmcpack_wfn_hdf, get_input_value
 from pauxy.estimators.greens_function import gab_spin
 
+def get_trial_conj(trial, real=False):
+    """Complex conjugate of the trial wavefunction.
+
+    Cached on the trial object, and so shared by all walkers, until trial.psi
+    is replaced. Stored in a tuple so that it is not serialised with the
+    trial.
+
+    Parameters
+    ----------
+    trial : object
+        Trial wavefunction object.
+    real : bool
+        If True and the trial wavefunction is real valued return a real array
+        for use with real walkers.
+
+    Returns
+    -------
+    psi_conj : :class:`numpy.ndarray`
+        Conjugated trial wavefunction.
+    """
+    return _trial_conj_cache(trial)[2 if real else 0]
+
+def get_trial_adjoint(trial, real=False):
+    """Conjugate transpose of the trial wavefunction.
+
+    Stored C-contiguous so that BLAS does not need to copy a transposed view
+    on every overlap evaluation. Cached alongside get_trial_conj.
+
+    Parameters
+    ----------
+    trial : object
+        Trial wavefunction object.
+    real : bool
+        If True and the trial wavefunction is real valued return a real array
+        for use with real walkers.
+
+    Returns
+    -------
+    psiH : :class:`numpy.ndarray`
+        Trial wavefunction with conjugated and swapped last two axes.
+    """
+    return _trial_conj_cache(trial)[3 if real else 1]
+
+def _trial_conj_cache(trial):
+    cache = getattr(trial, 'psi_conj_cache', None)
+    if cache is None or cache[0] is not trial.psi:
+        psi_conj = trial.psi.conj()
+        psiH = numpy.ascontiguousarray(numpy.swapaxes(psi_conj, -1, -2))
+        if psi_conj.imag.any():
+            (psi_real, psiH_real) = (psi_conj, psiH)
+        else:
+            (psi_real, psiH_real) = (psi_conj.real.copy(), psiH.real.copy())
+        cache = (trial.psi, psi_conj, psiH, psi_real, psiH_real)
+        trial.psi_conj_cache = cache
+    return cache[1:]
+
 def get_trial_wavefunction(system, options={}, mf=None,
                            comm=None, scomm=None, verbose=0):
     """Wrapper to select trial wavefunction class.
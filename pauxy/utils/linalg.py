@@ -1,4 +1,5 @@
 import functools
+import math
 import numpy
 import scipy.linalg
 import time
@@ -24,11 +25,62 @@ def sherman_morrison(Ainv, u, vt):
     Ainv : numpy.ndarray
         Updated matrix inverse.
     """
+    # Form the rank-1 correction from two matrix-vector products rather than
+    # building the outer product first, which would cost O(N^3).
+    Ainv_u = Ainv.dot(u)
+    vt_Ainv = vt.dot(Ainv)
+    return Ainv - numpy.outer(Ainv_u, vt_Ainv)/(1.0+vt.dot(Ainv_u))
 
-    return (
-        Ainv - (Ainv.dot(numpy.outer(u,vt)).dot(Ainv))/(1.0+vt.dot(Ainv).dot(u))
-    )
+def sherman_morrison_batched(Ainv, u, vt):
+    r"""Sherman-Morrison update of a stack of matrix inverses.
 
+    Applies :func:`sherman_morrison` to each matrix in the stack at once.
+
+    Parameters
+    ----------
+    Ainv : numpy.ndarray
+        Matrix inverses of shape (nmat, N, N) to be updated.
+    u : numpy.array
+        column vectors of shape (nmat, N).
+    vt : numpy.array
+        transpose of row vectors of shape (nmat, N) or (N,) if shared by all
+        matrices.
+
+    Returns
+    -------
+    Ainv : numpy.ndarray
+        Updated matrix inverses.
+    """
+    Ainv_u = numpy.einsum('...ij,...j->...i', Ainv, u)
+    vt_Ainv = numpy.einsum('...j,...jk->...k', vt, Ainv)
+    denom = 1.0 + numpy.einsum('...j,...j->...', vt, Ainv_u)
+    return Ainv - Ainv_u[...,:,None]*vt_Ainv[...,None,:]/denom[...,None,None]
+
+
+def slogdet_lu(lu, piv):
+    """Sign and log of determinant from an LU factorisation.
+
+    Parameters
+    ----------
+    lu : :class:`numpy.ndarray`
+        LU factors as returned by scipy.linalg.lu_factor.
+    piv : :class:`numpy.ndarray`
+        Pivot indices as returned by scipy.linalg.lu_factor.
+
+    Returns
+    -------
+    sign : float / complex
+        Phase of determinant.
+    logdet : float
+        Log of absolute value of determinant.
+    """
+    diag = numpy.diag(lu)
+    absd = numpy.abs(diag)
+    if numpy.any(absd == 0):
+        return (0.0*diag[0], -numpy.inf)
+    nswap = numpy.count_nonzero(piv != numpy.arange(len(piv)))
+    sign = (-1)**nswap * numpy.prod(diag/absd)
+    return (sign, numpy.sum(numpy.log(absd)))
 
 def diagonalise_sorted(H):
     """Diagonalise Hermitian matrix H and return sorted eigenvalues and vectors.
@@ -99,9 +151,10 @@ def reortho(A):
         Determinant of upper triangular matrix (R) from QR decomposition.
     """
     (Q, R) = scipy.linalg.qr(A, mode='economic')
-    signs = numpy.diag(numpy.sign(numpy.diag(R)))
-    Q = Q.dot(signs)
-    detR = scipy.linalg.det(signs.dot(R))
+    signs = numpy.sign(numpy.diag(R))
+    Q = Q * signs
+    # R is upper triangular so det(R) is the product of its diagonal.
+    detR = numpy.prod(signs*numpy.diag(R))
     return (Q, detR)
 
 def overlap(A,B):
@@ -161,14 +214,63 @@ def modified_cholesky(M, tol=1e-6, verbose=True, cmax=20):
     return numpy.array(chol_vecs[:nchol])
 
 def exponentiate_matrix(M, order=6):
-    """Taylor series approximation for matrix exponential"""
-    T = numpy.copy(M)
-    EXPM = numpy.identity(M.shape[0], dtype=M.dtype)
-    for n in range(1, order+1):
-        EXPM += T
-        T = M.dot(T) / (n+1)
+    """Taylor series approximation for matrix exponential.
+
+    The truncated series is evaluated using the Paterson-Stockmeyer scheme,
+    which requires O(sqrt(order)) rather than O(order) matrix products.
+
+    Parameters
+    ----------
+    M : :class:`numpy.ndarray`
+        Matrix to exponentiate.
+    order : int
+        Order at which to truncate the Taylor series.
+
+    Returns
+    -------
+    EXPM : :class:`numpy.ndarray`
+        Approximation to exp(M).
+    """
+    coeffs = [1.0/math.factorial(n) for n in range(order+1)]
+    # Powers M^0 ... M^s.
+    s = max(1, int(math.ceil(math.sqrt(order))))
+    powers = [numpy.identity(M.shape[0], dtype=M.dtype), M]
+    for i in range(2, s+1):
+        powers.append(M.dot(powers[-1]))
+    # Write the series as sum_j (M^s)^j B_j and evaluate with Horner's rule.
+    # If the highest block would only be a multiple of the identity fold it
+    # into the block below.
+    q, r = divmod(order, s)
+    if r == 0 and q > 0:
+        q, r = q - 1, s
+    EXPM = sum(coeffs[q*s+i]*powers[i] for i in range(r+1))
+    for j in range(q-1, -1, -1):
+        EXPM = powers[s].dot(EXPM)
+        for i in range(s):
+            EXPM += coeffs[j*s+i]*powers[i]
     return EXPM
 
+def exponentiate_hermitian(H, fac):
+    """Compute exp(fac*H) for Hermitian H via its eigendecomposition.
+
+    Cheaper and better conditioned than a generic Pade approximant
+    (scipy.linalg.expm) when H is known to be Hermitian.
+
+    Parameters
+    ----------
+    H : :class:`numpy.ndarray`
+        Hermitian matrix.
+    fac : float
+        Scalar prefactor of H in the exponent.
+
+    Returns
+    -------
+    EXPM : :class:`numpy.ndarray`
+        Matrix exponential exp(fac*H).
+    """
+    (eigs, eigv) = scipy.linalg.eigh(H)
+    return (eigv*numpy.exp(fac*eigs)).dot(eigv.conj().T)
+
 def molecular_orbitals_rhf(fock, AORot):
     fock_ortho = numpy.dot(AORot.conj().T, numpy.dot(fock, AORot))
     mo_energies, mo_orbs = scipy.linalg.eigh(fock_ortho)
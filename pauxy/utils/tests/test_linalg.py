@@ -0,0 +1,66 @@
+import numpy
+import pytest
+import scipy.linalg
+from pauxy.utils.linalg import (
+        exponentiate_hermitian, exponentiate_matrix, sherman_morrison,
+        sherman_morrison_batched, slogdet_lu
+        )
+
+@pytest.mark.unit
+def test_sherman_morrison():
+    numpy.random.seed(7)
+    A = numpy.random.random((8,8)) + 1j*numpy.random.random((8,8))
+    u = numpy.random.random(8)
+    vt = numpy.random.random(8) + 1j*numpy.random.random(8)
+    Ainv = numpy.linalg.inv(A)
+    Ainv_new = sherman_morrison(Ainv, u, vt)
+    ref = numpy.linalg.inv(A + numpy.outer(u,vt))
+    numpy.testing.assert_allclose(Ainv_new, ref, atol=1e-10)
+
+@pytest.mark.unit
+def test_sherman_morrison_batched():
+    numpy.random.seed(7)
+    A = numpy.random.random((3,8,8)) + 1j*numpy.random.random((3,8,8))
+    u = numpy.random.random((3,8))
+    vt = numpy.random.random(8) + 1j*numpy.random.random(8)
+    Ainv = numpy.linalg.inv(A)
+    Ainv_new = sherman_morrison_batched(Ainv, u, vt)
+    for i in range(3):
+        ref = sherman_morrison(Ainv[i], u[i], vt)
+        numpy.testing.assert_allclose(Ainv_new[i], ref, atol=1e-12)
+
+@pytest.mark.unit
+def test_exponentiate_hermitian():
+    numpy.random.seed(7)
+    A = numpy.random.random((8,8)) + 1j*numpy.random.random((8,8))
+    H = A + A.conj().T
+    ref = scipy.linalg.expm(-0.05*H)
+    numpy.testing.assert_allclose(exponentiate_hermitian(H, -0.05), ref,
+                                  atol=1e-12)
+
+@pytest.mark.unit
+def test_exponentiate_matrix():
+    numpy.random.seed(7)
+    M = 0.1*(numpy.random.random((8,8)) + 1j*numpy.random.random((8,8)))
+    for order in range(0, 10):
+        ref = numpy.identity(8, dtype=M.dtype)
+        T = numpy.identity(8, dtype=M.dtype)
+        for n in range(1, order+1):
+            T = M.dot(T) / n
+            ref += T
+        numpy.testing.assert_allclose(exponentiate_matrix(M, order), ref,
+                                      atol=1e-14)
+
+@pytest.mark.unit
+def test_slogdet_lu():
+    numpy.random.seed(7)
+    A = numpy.random.random((8,8)) + 1j*numpy.random.random((8,8))
+    sign, logdet = slogdet_lu(*scipy.linalg.lu_factor(A))
+    sign_ref, logdet_ref = numpy.linalg.slogdet(A)
+    assert sign == pytest.approx(sign_ref)
+    assert logdet == pytest.approx(logdet_ref)
+    A = numpy.random.random((8,8))
+    sign, logdet = slogdet_lu(*scipy.linalg.lu_factor(A))
+    sign_ref, logdet_ref = numpy.linalg.slogdet(A)
+    assert sign == pytest.approx(sign_ref)
+    assert logdet == pytest.approx(logdet_ref)
@@ -6,9 +6,11 @@ import numpy
 import scipy.linalg
 import sys
 import time
+from pauxy.estimators.mixed import local_energy_batch
 from pauxy.walkers.multi_ghf import MultiGHFWalker
 from pauxy.walkers.single_det import SingleDetWalker
 from pauxy.walkers.multi_det import MultiDetWalker
+from pauxy.trial_wavefunction.utils import get_trial_conj
 from pauxy.walkers.multi_coherent import MultiCoherentWalker
 from pauxy.walkers.thermal import ThermalWalker
 from pauxy.walkers.stack import FieldConfig
@@ -148,10 +150,12 @@ class Walkers(object):
         if self.write_freq > 0:
             self.write_restart = True
             self.dsets = []
+            # Scratch space reused for every restart write.
+            self.write_buffer = numpy.zeros((self.nwalkers, walker_size),
+                                            dtype=numpy.complex128)
             with h5py.File(self.write_file,'w',driver='mpio',comm=comm) as fh5:
-                for i in range(self.ntot_walkers):
-                    fh5.create_dataset('walker_%d'%i, (walker_size,),
-                                       dtype=numpy.complex128)
+                fh5.create_dataset('walkers', (self.ntot_walkers, walker_size),
+                                   dtype=numpy.complex128)
 
         else:
             self.write_restart = False
@@ -162,6 +166,51 @@ class Walkers(object):
         self.target_weight = qmc.ntot_walkers
         self.nw = qmc.nwalkers
         self.set_total_weight(qmc.ntot_walkers)
+        self.phi_all = None
+        self.phi_old_all = None
+        self.phi_right_all = None
+        self.G_all = None
+        self.inv_ovlp_all = None
+        if (self.walker_type == 'SD' and
+                self.walkers[0].phi.dtype in self.inplace_dtypes()):
+            self.stack_walker_arrays()
+
+    def inplace_dtypes(self):
+        """Array dtypes which Walker.set_buffer updates inplace."""
+        return (self.walker_buffer.dtype, self.walker_buffer.real.dtype)
+
+    def stack_walker_arrays(self):
+        """Store walker wavefunctions in contiguous arrays.
+
+        Each walker's phi, phi_old and phi_right become views into arrays of
+        shape (nwalkers, nbasis, nelec) so that operations on all walkers can
+        be done with a single numpy call. Similarly the Green's functions are
+        stored in G_all of shape (nwalkers, 2, nbasis, nbasis) and, if both
+        spin sectors are occupied, the inverse overlap matrices in
+        inv_ovlp_all. Walker arrays must subsequently only be updated inplace.
+        """
+        self.phi_all = numpy.array([w.phi for w in self.walkers])
+        self.phi_old_all = numpy.array([w.phi_old for w in self.walkers])
+        self.phi_right_all = numpy.array([w.phi_right for w in self.walkers])
+        for (i, w) in enumerate(self.walkers):
+            w.phi = self.phi_all[i]
+            w.phi_old = self.phi_old_all[i]
+            w.phi_right = self.phi_right_all[i]
+        dtypes = self.inplace_dtypes()
+        if all(w.G.dtype in dtypes for w in self.walkers):
+            self.G_all = numpy.array([w.G for w in self.walkers])
+            for (i, w) in enumerate(self.walkers):
+                w.G = self.G_all[i]
+        if (self.walkers[0].ndown > 0 and
+                all(inv.dtype in dtypes for w in self.walkers
+                    for inv in w.inv_ovlp)):
+            self.inv_ovlp_all = [
+                    numpy.array([w.inv_ovlp[0] for w in self.walkers]),
+                    numpy.array([w.inv_ovlp[1] for w in self.walkers])
+                    ]
+            for (i, w) in enumerate(self.walkers):
+                w.inv_ovlp[0] = self.inv_ovlp_all[0][i]
+                w.inv_ovlp[1] = self.inv_ovlp_all[1][i]
 
     def orthogonalise(self, trial, free_projection):
         """Orthogonalise all walkers.
@@ -173,6 +222,9 @@ class Walkers(object):
         free_projection : bool
             True if doing free projection.
         """
+        if self.phi_all is not None:
+            self.reortho_batched(free_projection)
+            return
         for w in self.walkers:
             detR = w.reortho(trial)
             if free_projection:
@@ -180,6 +232,70 @@ class Walkers(object):
                 w.weight *= magn
                 w.phase *= cmath.exp(1j*dtheta)
 
+    def reortho_batched(self, free_projection):
+        """Reorthogonalise all single determinant walkers at once.
+
+        Equivalent to calling reortho on each walker but performs a single
+        batched QR decomposition per spin on the stacked walker array.
+
+        Parameters
+        ----------
+        free_projection : bool
+            True if doing free projection.
+        """
+        nup = self.walkers[0].nup
+        ndown = self.walkers[0].ndown
+        log_det = numpy.zeros(len(self.walkers))
+        spins = [slice(0,nup)]
+        if ndown > 0:
+            spins.append(slice(nup,nup+ndown))
+        for s in spins:
+            (Q, R) = numpy.linalg.qr(self.phi_all[:,:,s])
+            R_diag = numpy.diagonal(R, axis1=1, axis2=2)
+            # Keep detR positive by moving the signs into the orbitals.
+            self.phi_all[:,:,s] = Q * numpy.sign(R_diag)[:,None,:]
+            log_det += numpy.sum(numpy.log(numpy.abs(R_diag)), axis=1)
+        for (i, w) in enumerate(self.walkers):
+            detR = numpy.exp(log_det[i]-w.detR_shift)
+            w.log_detR += numpy.log(detR)
+            w.detR = detR
+            w.ot = w.ot / detR
+            w.ovlp = w.ot
+            if free_projection:
+                (magn, dtheta) = cmath.polar(detR)
+                w.weight *= magn
+                w.phase *= cmath.exp(1j*dtheta)
+
+    def greens_function_batched(self, trial):
+        """Compute green's functions of all single determinant walkers at once.
+
+        Equivalent to calling greens_function on each walker but solves the
+        stacked overlap matrices of all walkers in a single call per spin.
+
+        Parameters
+        ----------
+        trial : object
+            Trial wavefunction object.
+        """
+        nup = self.walkers[0].nup
+        ndown = self.walkers[0].ndown
+        psi_conj = get_trial_conj(trial,
+                                  real=not numpy.iscomplexobj(self.phi_all))
+        spins = [(0, slice(0,nup))]
+        if ndown > 0:
+            spins.append((1, slice(nup,nup+ndown)))
+        for (ispin, s) in spins:
+            phiT = self.phi_all[:,:,s].transpose(0,2,1)
+            ovlp = numpy.matmul(phiT, psi_conj[:,s])
+            Gmod = numpy.linalg.solve(ovlp, phiT)
+            G = numpy.matmul(psi_conj[:,s], Gmod)
+            if self.G_all is not None:
+                self.G_all[:,ispin] = G
+            for (i, w) in enumerate(self.walkers):
+                w.Gmod[ispin][:] = Gmod[i]
+                if self.G_all is None:
+                    w.G[ispin][:] = G[i]
+
     def add_field_config(self, nprop_tot, nbp, system, dtype):
         """Add FieldConfig object to walker object.
 
@@ -199,6 +315,9 @@ class Walkers(object):
 
     def copy_historic_wfn(self):
         """Copy current wavefunction to psi_n for next back propagation step."""
+        if self.phi_all is not None:
+            numpy.copyto(self.phi_old_all, self.phi_all)
+            return
         for (i,w) in enumerate(self.walkers):
             numpy.copyto(self.walkers[i].phi_old, self.walkers[i].phi)
 
@@ -208,10 +327,15 @@ class Walkers(object):
         Parameters
         ----------
         phi_bp : object
-            list of walker objects containing back propagated walkers.
+            list of walker objects containing back propagated walkers or array
+            of back propagated wavefunctions of shape (nwalkers, nbasis, nelec).
         """
-        for (i, (w,wbp)) in enumerate(zip(self.walkers, phi_bp)):
-            numpy.copyto(self.walkers[i].phi_bp, wbp.phi)
+        if isinstance(phi_bp, numpy.ndarray):
+            for (w, wbp) in zip(self.walkers, phi_bp):
+                numpy.copyto(w.phi_bp, wbp)
+        else:
+            for (w, wbp) in zip(self.walkers, phi_bp):
+                numpy.copyto(w.phi_bp, wbp.phi)
 
     def copy_init_wfn(self):
         """Copy current wavefunction to initial wavefunction.
@@ -219,6 +343,9 @@ class Walkers(object):
         The definition of the initial wavefunction depends on whether we are
         calculating an ITCF or not.
         """
+        if self.phi_all is not None:
+            numpy.copyto(self.phi_right_all, self.phi_all)
+            return
         for (i,w) in enumerate(self.walkers):
             numpy.copyto(self.walkers[i].phi_right, self.walkers[i].phi)
 
@@ -230,7 +357,7 @@ class Walkers(object):
         weights = numpy.array([abs(w.weight) for w in self.walkers])
         global_weights = numpy.empty(len(weights)*comm.size)
         comm.Allgather(weights, global_weights)
-        total_weight = sum(global_weights)
+        total_weight = numpy.sum(global_weights)
         # Rescale weights to combat exponential decay/growth.
         scale = total_weight / self.target_weight
         if total_weight < 1e-8:
@@ -271,25 +398,18 @@ class Walkers(object):
         else:
             parent_ix = numpy.empty(len(weights), dtype='i')
         if comm.rank == 0:
-            total_weight = sum(weights)
             cprobs = numpy.cumsum(weights)
+            total_weight = cprobs[-1]
             r = numpy.random.random()
-            comb = [(i+r) * (total_weight/self.target_weight) for i in
-                    range(self.target_weight)]
-            iw = 0
-            ic = 0
-            while ic < len(comb):
-                if comb[ic] < cprobs[iw]:
-                    parent_ix[iw] += 1
-                    ic += 1
-                else:
-                    iw += 1
-            data = {'ix': parent_ix}
-        else:
-            data = None
-
-        data = comm.bcast(data, root=0)
-        parent_ix = data['ix']
+            comb = ((numpy.arange(self.target_weight)+r) *
+                    (total_weight/self.target_weight))
+            # Walker iw is the parent of every comb tooth in
+            # [cprobs[iw-1], cprobs[iw]).
+            parents = numpy.searchsorted(cprobs, comb, side='right')
+            parents = numpy.minimum(parents, len(weights)-1)
+            parent_ix[:] = numpy.bincount(parents, minlength=len(weights))
+        # Broadcast the raw integer buffer rather than a pickled object.
+        comm.Bcast(parent_ix, root=0)
         # Keep total weight saved for capping purposes.
         # where returns a tuple (array,), selecting first element.
         kill = numpy.where(parent_ix == 0)[0]
@@ -310,11 +430,15 @@ class Walkers(object):
                 # with h5py.File('before_{}.h5'.format(comm.rank), 'a') as fh5:
                     # fh5['walker_{}_{}_{}'.format(c,k,dest_proc)] = self.walkers[clone_pos].get_buffer()
                 buff = self.walkers[clone_pos].get_buffer()
-                reqs.append(comm.Isend(buff, dest=dest_proc, tag=i))
+                if dest_proc == comm.rank:
+                    # Clone within this processor without going through MPI.
+                    self.walkers[k % self.nw].set_buffer(buff)
+                else:
+                    reqs.append(comm.Isend(buff, dest=dest_proc, tag=i))
         # Now receive walkers on processors where walkers are to be killed.
         for i, (c, k) in enumerate(zip(clone, kill)):
-            # Receiving to current processor?
-            if k // self.nw == comm.rank:
+            # Receiving to current processor from another processor?
+            if k // self.nw == comm.rank and c // self.nw != comm.rank:
                 # Processor we are receiving from.
                 source_proc = c // self.nw
                 # Location of walker to kill in local list of walkers.
@@ -344,7 +468,7 @@ class Walkers(object):
         if comm.rank == 0:
             # Rescale weights.
             glob_inf = numpy.array([item for sub in glob_inf for item in sub])
-            total_weight = sum(w[0] for w in glob_inf)
+            total_weight = numpy.sum(glob_inf[:,0])
             sort = numpy.argsort(glob_inf[:,0], kind='mergesort')
             isort = numpy.argsort(sort, kind='mergesort')
             glob_inf = glob_inf[sort]
@@ -412,9 +536,37 @@ class Walkers(object):
             r.wait()
 
 
+    def local_energies(self, system):
+        """Compute local energies of all walkers at once.
+
+        Uses each walker's current Green's function. Only available for the
+        Hubbard model, see :func:`pauxy.estimators.mixed.local_energy_batch`.
+
+        Parameters
+        ----------
+        system : object
+            System object.
+
+        Returns
+        -------
+        (E, T, V) : tuple
+            Arrays of local energy components for each walker.
+        """
+        if self.G_all is not None:
+            Gs = self.G_all
+        else:
+            Gs = numpy.array([w.G for w in self.walkers])
+        return local_energy_batch(system, Gs)
+
     def recompute_greens_function(self, trial, time_slice=None):
+        if self.phi_all is not None:
+            self.greens_function_batched(trial)
+            return
         for w in self.walkers:
-            w.greens_function(trial, time_slice)
+            if time_slice is None:
+                w.greens_function(trial)
+            else:
+                w.greens_function(trial, time_slice)
 
     def set_total_weight(self, total_weight):
         for w in self.walkers:
@@ -431,7 +583,9 @@ class Walkers(object):
 
     def get_write_buffer(self, i):
         w = self.walkers[i]
-        buff = numpy.concatenate([[w.weight], [w.phase], [w.ot], w.phi.ravel()])
+        buff = self.write_buffer[i]
+        buff[:3] = [w.weight, w.phase, w.ot]
+        buff[3:] = w.phi.ravel()
         return buff
 
     def set_walker_from_buffer(self, i, buff):
@@ -439,15 +593,24 @@ class Walkers(object):
         w.weight = buff[0]
         w.phase = buff[1]
         w.ot = buff[2]
-        w.phi = buff[3:].reshape(self.walkers[i].phi.shape)
+        phi = buff[3:].reshape(w.phi.shape)
+        w.phi[:] = phi if numpy.iscomplexobj(w.phi) else phi.real
 
     def write_walkers(self, comm):
         start = time.time()
+        buff = self.write_buffer
+        if self.phi_all is not None:
+            buff[:,:3] = [[w.weight, w.phase, w.ot] for w in self.walkers]
+            buff[:,3:] = self.phi_all.reshape(self.nwalkers, -1)
+        else:
+            for i in range(self.nwalkers):
+                self.get_write_buffer(i)
         with h5py.File(self.write_file,'r+',driver='mpio',comm=comm) as fh5:
-            for (i,w) in enumerate(self.walkers):
-                ix = i + self.nwalkers*comm.rank
-                buff = self.get_write_buffer(i)
-                fh5['walker_%d'%ix][:] = self.get_write_buffer(i)
+            # Each processor writes its contiguous block of walkers.
+            dset = fh5['walkers']
+            ix = self.nwalkers*comm.rank
+            with dset.collective:
+                dset[ix:ix+self.nwalkers] = buff
         if comm.rank == 0:
             print(" # Writing walkers to file.")
             print(" # Time to write restart: {:13.8e} s"
@@ -456,10 +619,10 @@ class Walkers(object):
     def update_log_ovlp(self, comm):
         send = numpy.zeros(3, dtype=numpy.complex128)
         # Overlap log factor
-        send[0] = sum(abs(w.ot) for w in self.walkers)
+        send[0] = numpy.sum(numpy.abs([w.ot for w in self.walkers]))
         # Det R log factor
-        send[1] = sum(abs(w.detR) for w in self.walkers)
-        send[2] = sum(abs(w.log_detR) for w in self.walkers)
+        send[1] = numpy.sum(numpy.abs([w.detR for w in self.walkers]))
+        send[2] = numpy.sum(numpy.abs([w.log_detR for w in self.walkers]))
         global_av = numpy.zeros(3, dtype=numpy.complex128)
         comm.Allreduce(send, global_av)
         log_shift = numpy.log(global_av[0]/self.ntot_walkers)
@@ -476,10 +639,16 @@ class Walkers(object):
 
     def read_walkers(self, comm):
         with h5py.File(self.read_file, 'r') as fh5:
+            ix = self.nwalkers*comm.rank
+            if 'walkers' in fh5:
+                buff = fh5['walkers'][ix:ix+self.nwalkers]
+                for (i,w) in enumerate(self.walkers):
+                    self.set_walker_from_buffer(i, buff[i])
+                return
+            # Restart files from older versions store one dataset per walker.
             for (i,w) in enumerate(self.walkers):
                 try:
-                    ix = i + self.nwalkers*comm.rank
-                    self.set_walker_from_buffer(i, fh5['walker_%d'%ix][:])
+                    self.set_walker_from_buffer(i, fh5['walker_%d'%(ix+i)][:])
                 except KeyError:
                     print(" # Could not read walker data from:"
                           " %s"%(self.read_file))
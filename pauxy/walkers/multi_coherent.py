@@ -1,4 +1,3 @@
-import copy
 import numpy
 import scipy.linalg
 import random
@@ -37,7 +36,7 @@ class MultiCoherentWalker(object):
         self.phase = 1 + 0j
         self.nup = system.nup
         self.E_L = 0.0
-        self.phi = copy.deepcopy(trial.init)
+        self.phi = trial.init.copy()
         self.nperms = trial.nperms
 
         dtype = numpy.complex128
@@ -128,11 +127,11 @@ class MultiCoherentWalker(object):
         self.nup = system.nup
         self.ndown = system.ndown
         # Historic wavefunction for back propagation.
-        self.phi_old = copy.deepcopy(self.phi)
+        self.phi_old = self.phi.copy()
         # Historic wavefunction for ITCF.
-        self.phi_init = copy.deepcopy(self.phi)
+        self.phi_init = self.phi.copy()
         # Historic wavefunction for ITCF.
-        # self.phi_bp = copy.deepcopy(trial.psi)
+        # self.phi_bp = trial.psi.copy()
         
         if nbp is not None:
             self.field_configs = FieldConfig(system.nfields,
@@ -325,16 +324,17 @@ class MultiCoherentWalker(object):
         if ndown > 0:
             (self.phi[:,nup:], Rdown) = scipy.linalg.qr(self.phi[:,nup:],
                                                         mode='economic')
-        signs_up = numpy.diag(numpy.sign(numpy.diag(Rup)))
+        # R is upper triangular so det(R) is the product of its diagonal.
+        signs_up = numpy.sign(numpy.diag(Rup))
         if (ndown > 0):
-            signs_down = numpy.diag(numpy.sign(numpy.diag(Rdown)))
-        self.phi[:,:nup] = self.phi[:,:nup].dot(signs_up)
+            signs_down = numpy.sign(numpy.diag(Rdown))
+        self.phi[:,:nup] *= signs_up
         if (ndown > 0):
-            self.phi[:,nup:] = self.phi[:,nup:].dot(signs_down)
-        drup = scipy.linalg.det(signs_up.dot(Rup))
+            self.phi[:,nup:] *= signs_down
+        drup = numpy.prod(signs_up*numpy.diag(Rup))
         drdn = 1.0
         if (ndown > 0):
-            drdn = scipy.linalg.det(signs_down.dot(Rdown))
+            drdn = numpy.prod(signs_down*numpy.diag(Rdown))
         detR = drup * drdn
         self.ot = self.ot / detR
         return detR
@@ -3,7 +3,9 @@ import numpy
 import scipy.linalg
 from pauxy.estimators.mixed import local_energy_multi_det
 from pauxy.walkers.walker import Walker
+from pauxy.utils.linalg import sherman_morrison_batched
 from pauxy.utils.misc import get_numeric_names
+from pauxy.trial_wavefunction.utils import get_trial_conj, get_trial_adjoint
 
 class MultiDetWalker(Walker):
     """Multi-Det style walker.
@@ -87,9 +89,10 @@ class MultiDetWalker(Walker):
 
     def overlap_direct(self, trial):
         nup = self.nup
+        (phi_up, phi_dn) = (self.phi[:,:nup], self.phi[:,nup:])
         for (i, det) in enumerate(trial.psi):
-            Oup = numpy.dot(det[:,:nup].conj().T, self.phi[:,:nup])
-            Odn = numpy.dot(det[:,nup:].conj().T, self.phi[:,nup:])
+            Oup = numpy.dot(det[:,:nup].conj().T, phi_up)
+            Odn = numpy.dot(det[:,nup:].conj().T, phi_dn)
             self.ovlps[i] = scipy.linalg.det(Oup) * scipy.linalg.det(Odn)
             if abs(self.ovlps[i]) > 1e-16:
                 self.inv_ovlp[0][i] = scipy.linalg.inv(Oup)
@@ -106,11 +109,33 @@ class MultiDetWalker(Walker):
             Trial wavefunction.
         """
         nup = self.nup
-        for (indx, t) in enumerate(trial.psi):
-            Oup = numpy.dot(t[:,:nup].conj().T, self.phi[:,:nup])
-            self.inv_ovlp[0][indx,:,:] = scipy.linalg.inv(Oup)
-            Odn = numpy.dot(t[:,nup:].conj().T, self.phi[:,nup:])
-            self.inv_ovlp[1][indx,:,:] = scipy.linalg.inv(Odn)
+        # Overlap matrices for all determinants, shape (ndets, nel, nel).
+        psiH = get_trial_adjoint(trial)
+        Oup = numpy.matmul(psiH[:,:nup,:], self.phi[:,:nup])
+        self.inv_ovlp[0][:] = numpy.linalg.inv(Oup)
+        Odn = numpy.matmul(psiH[:,nup:,:], self.phi[:,nup:])
+        self.inv_ovlp[1][:] = numpy.linalg.inv(Odn)
+
+    def update_inverse_overlap(self, trial, vtup, vtdown, i):
+        """Update inverse overlap matrices given a single row update of walker.
+
+        Parameters
+        ----------
+        trial : object
+            Trial wavefunction object.
+        vtup : :class:`numpy.ndarray`
+            Update vector for spin up sector.
+        vtdown : :class:`numpy.ndarray`
+            Update vector for spin down sector.
+        i : int
+            Basis index.
+        """
+        nup = self.nup
+        psi_conj = get_trial_conj(trial)
+        self.inv_ovlp[0] = sherman_morrison_batched(self.inv_ovlp[0],
+                                                    psi_conj[:,i,:nup], vtup)
+        self.inv_ovlp[1] = sherman_morrison_batched(self.inv_ovlp[1],
+                                                    psi_conj[:,i,nup:], vtdown)
 
     def calc_otrial(self, trial):
         """Caculate overlap with trial wavefunction.
@@ -125,11 +150,12 @@ class MultiDetWalker(Walker):
         ovlp : float / complex
             Overlap.
         """
-        for ix in range(self.ndets):
-            det_O_up = 1.0 / scipy.linalg.det(self.inv_ovlp[0][ix])
-            det_O_dn = 1.0 / scipy.linalg.det(self.inv_ovlp[1][ix])
-            self.ovlps[ix] = det_O_up * det_O_dn
-            self.weights[ix] = trial.coeffs[ix].conj() * self.ovlps[ix]
+        # det(O) = 1/det(O^{-1}), evaluated for all determinants at once in
+        # log form to avoid overflow.
+        sign_up, logdet_up = numpy.linalg.slogdet(self.inv_ovlp[0])
+        sign_dn, logdet_dn = numpy.linalg.slogdet(self.inv_ovlp[1])
+        self.ovlps[:] = numpy.exp(-logdet_up-logdet_dn) / (sign_up*sign_dn)
+        self.weights[:] = trial.coeffs.conj() * self.ovlps
         return sum(self.weights)
 
     def calc_overlap(self, trial):
@@ -146,9 +172,11 @@ class MultiDetWalker(Walker):
             Overlap.
         """
         nup = self.nup
+        psi_conj = get_trial_conj(trial)
+        (phi_up, phi_dn) = (self.phi[:,:nup], self.phi[:,nup:])
         for ix in range(self.ndets):
-            Oup = numpy.dot(trial.psi[ix,:,:nup].conj().T, self.phi[:,:nup])
-            Odn = numpy.dot(trial.psi[ix,:,nup:].conj().T, self.phi[:,nup:])
+            Oup = numpy.dot(psi_conj[ix,:,:nup].T, phi_up)
+            Odn = numpy.dot(psi_conj[ix,:,nup:].T, phi_dn)
             det_Oup = scipy.linalg.det(Oup)
             det_Odn = scipy.linalg.det(Odn)
             self.ovlps[ix] = det_Oup * det_Odn
@@ -177,20 +205,57 @@ class MultiDetWalker(Walker):
         if ndown > 0:
             (self.phi[:,nup:], Rdown) = scipy.linalg.qr(self.phi[:,nup:],
                                                         mode='economic')
-        signs_up = numpy.diag(numpy.sign(numpy.diag(Rup)))
+        # R is upper triangular so det(R) is the product of its diagonal.
+        signs_up = numpy.sign(numpy.diag(Rup))
         if (ndown > 0):
-            signs_down = numpy.diag(numpy.sign(numpy.diag(Rdown)))
-        self.phi[:,:nup] = self.phi[:,:nup].dot(signs_up)
+            signs_down = numpy.sign(numpy.diag(Rdown))
+        self.phi[:,:nup] *= signs_up
         if (ndown > 0):
-            self.phi[:,nup:] = self.phi[:,nup:].dot(signs_down)
-        drup = scipy.linalg.det(signs_up.dot(Rup))
+            self.phi[:,nup:] *= signs_down
+        drup = numpy.prod(signs_up*numpy.diag(Rup))
         drdn = 1.0
         if (ndown > 0):
-            drdn = scipy.linalg.det(signs_down.dot(Rdown))
+            drdn = numpy.prod(signs_down*numpy.diag(Rdown))
         detR = drup * drdn
         self.ot = self.ot / detR
         return detR
 
+    def batched_greens_function(self, psi_conj, Gi):
+        """Compute green's functions for all determinants at once.
+
+        Determinants with vanishing overlap are left untouched.
+
+        Parameters
+        ----------
+        psi_conj : :class:`numpy.ndarray`
+            Complex conjugate of trial determinants, shape (ndets, nbasis, ne).
+        Gi : :class:`numpy.ndarray`
+            Output array for green's functions, shape (ndets, 2, nbasis, nbasis).
+
+        Returns
+        -------
+        ovlps : :class:`numpy.ndarray`
+            Overlap of walker with each determinant.
+        mask : :class:`numpy.ndarray`
+            Determinants with non-vanishing overlap.
+        """
+        nup = self.nup
+        ovlps = numpy.ones(len(psi_conj),
+                           dtype=numpy.result_type(self.phi, psi_conj))
+        mask = numpy.ones(len(psi_conj), dtype=bool)
+        for (s, e, ix) in [(0, nup, 0), (nup, self.phi.shape[1], 1)]:
+            phiT = self.phi[:,s:e].T
+            # det(A) = det(A^T)
+            O = numpy.matmul(phiT, psi_conj[:,:,s:e])
+            ovlps *= numpy.linalg.det(O)
+            mask &= abs(ovlps) >= 1e-16
+            O = O[mask]
+            # Broadcast explicitly so phiT is treated as a stack of matrices.
+            rhs = numpy.broadcast_to(phiT, (len(O),)+phiT.shape)
+            Gi[mask,ix] = numpy.matmul(psi_conj[mask,:,s:e],
+                                       numpy.linalg.solve(O, rhs))
+        return (ovlps, mask)
+
     def greens_function(self, trial):
         """Compute walker's green's function.
 
@@ -199,58 +264,18 @@ class MultiDetWalker(Walker):
         trial : object
             Trial wavefunction object.
         """
-        nup = self.nup
-        tot_ovlp = 0.0
-        for (ix, detix) in enumerate(trial.psi):
-            # construct "local" green's functions for each component of psi_T
-            Oup = numpy.dot(self.phi[:,:nup].T, detix[:,:nup].conj())
-            # det(A) = det(A^T)
-            ovlp = scipy.linalg.det(Oup)
-            if abs(ovlp) < 1e-16:
-                continue
-            inv_ovlp = scipy.linalg.inv(Oup)
-            self.Gi[ix,0,:,:] = numpy.dot(detix[:,:nup].conj(),
-                                          numpy.dot(inv_ovlp,
-                                                    self.phi[:,:nup].T)
-                                          )
-            Odn = numpy.dot(self.phi[:,nup:].T, detix[:,nup:].conj())
-            ovlp *= scipy.linalg.det(Odn)
-            if abs(ovlp) < 1e-16:
-                continue
-            inv_ovlp = scipy.linalg.inv(Odn)
-            tot_ovlp += trial.coeffs[ix].conj()*ovlp
-            self.Gi[ix,1,:,:] = numpy.dot(detix[:,nup:].conj(),
-                                          numpy.dot(inv_ovlp,
-                                                    self.phi[:,nup:].T)
-                                          )
-            self.ovlps[ix] = ovlp
-            self.weights[ix] = trial.coeffs[ix].conj() * self.ovlps[ix]
+        (ovlps, mask) = self.batched_greens_function(get_trial_conj(trial),
+                                                     self.Gi)
+        tot_ovlp = numpy.sum(trial.coeffs[mask].conj()*ovlps[mask])
+        self.ovlps[mask] = ovlps[mask]
+        self.weights[mask] = trial.coeffs[mask].conj() * ovlps[mask]
 
         if(self.split_trial_local_energy):
-            tot_ovlp_energy = 0.0
-            for (ix, detix) in enumerate(trial.le_psi):
-                # construct "local" green's functions for each component of psi_T
-                Oup = numpy.dot(self.phi[:,:nup].T, detix[:,:nup].conj())
-                # det(A) = det(A^T)
-                ovlp = scipy.linalg.det(Oup)
-                if abs(ovlp) < 1e-16:
-                    continue
-                inv_ovlp = scipy.linalg.inv(Oup)
-                self.le_Gi[ix,0,:,:] = numpy.dot(detix[:,:nup].conj(),
-                                              numpy.dot(inv_ovlp,
-                                                        self.phi[:,:nup].T)
-                                              )
-                Odn = numpy.dot(self.phi[:,nup:].T, detix[:,nup:].conj())
-                ovlp *= scipy.linalg.det(Odn)
-                if abs(ovlp) < 1e-16:
-                    continue
-                inv_ovlp = scipy.linalg.inv(Odn)
-                tot_ovlp_energy += trial.le_coeffs[ix].conj()*ovlp
-                self.le_Gi[ix,1,:,:] = numpy.dot(detix[:,nup:].conj(),
-                                              numpy.dot(inv_ovlp,
-                                                        self.phi[:,nup:].T)
-                                              )
-                self.le_weights[ix] = trial.le_coeffs[ix].conj() * self.ovlps[ix]
+            (ovlps, mask) = self.batched_greens_function(trial.le_psi.conj(),
+                                                         self.le_Gi)
+            coeffs = trial.le_coeffs[mask].conj()
+            tot_ovlp_energy = numpy.sum(coeffs*ovlps[mask])
+            self.le_weights[mask] = coeffs * self.ovlps[:len(mask)][mask]
 
             # self.le_weights *= (tot_ovlp_energy / tot_ovlp)
             self.le_oratio = tot_ovlp_energy / tot_ovlp
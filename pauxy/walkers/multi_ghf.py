@@ -1,4 +1,3 @@
-import copy
 import numpy
 from pauxy.estimators.hubbard import local_energy_hubbard_ghf
 from pauxy.trial_wavefunction.free_electron import FreeElectron
@@ -44,7 +43,7 @@ class MultiGHFWalker(object):
                 self.phi[:system.nbasis,:system.nup] = tmp.psi[:,:system.nup]
                 self.phi[system.nbasis:,system.nup:] = tmp.psi[:,system.nup:]
         else:
-            self.phi = copy.deepcopy(trial.psi)
+            self.phi = trial.psi.copy()
         # This stores an array of overlap matrices with the various elements of
         # the trial wavefunction.
         self.inv_ovlp = numpy.zeros(shape=(trial.ndets, system.ne, system.ne),
@@ -76,11 +75,11 @@ class MultiGHFWalker(object):
                                                          sum(self.weights))[0].real
         self.nb = system.nbasis
         # Historic wavefunction for back propagation.
-        self.phi_old = copy.deepcopy(self.phi)
+        self.phi_old = self.phi.copy()
         # Historic wavefunction for ITCF.
-        self.phi_init = copy.deepcopy(self.phi)
+        self.phi_init = self.phi.copy()
         # Historic wavefunction for ITCF.
-        self.phi_bp = copy.deepcopy(trial.psi)
+        self.phi_bp = trial.psi.copy()
 
     def inverse_overlap(self, trial):
         """Compute inverse overlap matrix from scratch.
@@ -155,13 +154,13 @@ class MultiGHFWalker(object):
             scipy.linalg.qr(self.phi[self.nb:,nup:], mode='economic')
         )
         # Enforce a positive diagonal for the overlap.
-        signs_up = numpy.diag(numpy.sign(numpy.diag(Rup)))
-        signs_down = numpy.diag(numpy.sign(numpy.diag(Rdown)))
-        self.phi[:self.nb,:nup] = self.phi[:self.nb,:nup].dot(signs_up)
-        self.phi[self.nb:,nup:] = self.phi[self.nb:,nup:].dot(signs_down)
-        # Todo: R is upper triangular.
-        drup = scipy.linalg.det(signs_up.dot(Rup))
-        drdn = scipy.linalg.det(signs_down.dot(Rdown))
+        signs_up = numpy.sign(numpy.diag(Rup))
+        signs_down = numpy.sign(numpy.diag(Rdown))
+        self.phi[:self.nb,:nup] *= signs_up
+        self.phi[self.nb:,nup:] *= signs_down
+        # R is upper triangular so det(R) is the product of its diagonal.
+        drup = numpy.prod(signs_up*numpy.diag(Rup))
+        drdn = numpy.prod(signs_down*numpy.diag(Rdown))
         detR = drup * drdn
         self.inverse_overlap(trial.psi)
         self.ot = self.calc_otrial(trial)
@@ -2,11 +2,12 @@ import numpy
 import scipy.linalg
 from pauxy.estimators.mixed import local_energy, local_energy_hh
 from pauxy.trial_wavefunction.free_electron import FreeElectron
-from pauxy.utils.linalg import sherman_morrison
+from pauxy.utils.linalg import sherman_morrison, slogdet_lu
 from pauxy.walkers.stack import FieldConfig
 from pauxy.walkers.walker import Walker
 from pauxy.utils.misc import get_numeric_names
 from pauxy.trial_wavefunction.harmonic_oscillator import HarmonicOscillator
+from pauxy.trial_wavefunction.utils import get_trial_conj, get_trial_adjoint
 
 class SingleDetWalker(Walker):
     """UHF style walker.
@@ -32,6 +33,13 @@ class SingleDetWalker(Walker):
         Walker.__init__(self, system, trial,
                         walker_opts=walker_opts, index=index,
                         nprop_tot=nprop_tot, nbp=nbp)
+        if walker_opts.get('real', False):
+            # Real storage, requested when both the trial wavefunction and the
+            # propagator are real.
+            assert not self.phi.imag.any()
+            self.phi = self.phi.real.copy()
+            self.phi_old = self.phi.copy()
+            self.phi_right = self.phi.copy()
         self.inv_ovlp = [0.0, 0.0]
 
         self.phi_boson = None
@@ -66,14 +74,16 @@ class SingleDetWalker(Walker):
         self.le_oratio = 1.0
         self.ovlp = self.ot
 
+        dtype = numpy.result_type(self.phi,
+                                  get_trial_conj(trial, real=self.is_real()))
         self.G = numpy.zeros(shape=(2, system.nbasis, system.nbasis),
-                             dtype=trial.psi.dtype)
+                             dtype=dtype)
         self.C0 = trial.psi.copy()
 
         self.Gmod = [numpy.zeros(shape=(system.nup, system.nbasis),
-                                 dtype=trial.psi.dtype),
+                                 dtype=dtype),
                      numpy.zeros(shape=(system.ndown, system.nbasis),
-                                 dtype=trial.psi.dtype)]
+                                 dtype=dtype)]
         self.greens_function(trial)
         
         if system.control_variate:
@@ -93,6 +103,10 @@ class SingleDetWalker(Walker):
 
         self.buff_names, self.buff_size = get_numeric_names(self.__dict__)
 
+    def is_real(self):
+        """True if the walker's wavefunction is stored as a real array."""
+        return not numpy.iscomplexobj(self.phi)
+
     def inverse_overlap(self, trial):
         """Compute inverse overlap matrix from scratch.
 
@@ -104,15 +118,35 @@ class SingleDetWalker(Walker):
         nup = self.nup
         ndown = self.ndown
 
-        self.inv_ovlp[0] = (
-            scipy.linalg.inv((trial.psi[:,:nup].conj()).T.dot(self.phi[:,:nup]))
-        )
-
-        self.inv_ovlp[1] = numpy.zeros(self.inv_ovlp[0].shape)
+        psiH = get_trial_adjoint(trial, real=self.is_real())
+        inv_up = scipy.linalg.inv(psiH[:nup].dot(self.phi[:,:nup]))
         if (ndown>0):
-            self.inv_ovlp[1] = (
-                scipy.linalg.inv((trial.psi[:,nup:].conj()).T.dot(self.phi[:,nup:]))
-            )
+            inv_dn = scipy.linalg.inv(psiH[nup:].dot(self.phi[:,nup:]))
+        else:
+            inv_dn = numpy.zeros(inv_up.shape)
+        self.set_inv_ovlp(inv_up, inv_dn)
+
+    def set_inv_ovlp(self, inv_up, inv_dn):
+        """Store inverse overlap matrices.
+
+        Copies inplace when possible so that views into the walker handler's
+        contiguous arrays remain valid.
+
+        Parameters
+        ----------
+        inv_up : :class:`numpy.ndarray`
+            Inverse overlap matrix for spin up sector.
+        inv_dn : :class:`numpy.ndarray`
+            Inverse overlap matrix for spin down sector.
+        """
+        for (ispin, inv) in enumerate([inv_up, inv_dn]):
+            current = self.inv_ovlp[ispin]
+            if (isinstance(current, numpy.ndarray) and
+                    current.shape == inv.shape and
+                    numpy.can_cast(inv.dtype, current.dtype, 'same_kind')):
+                current[:] = inv
+            else:
+                self.inv_ovlp[ispin] = inv
 
     def update_inverse_overlap(self, trial, vtup, vtdown, i):
         """Update inverse overlap matrix given a single row update of walker.
@@ -130,12 +164,11 @@ class SingleDetWalker(Walker):
         """
         nup = self.nup
         ndown = self.ndown
+        psi_conj = get_trial_conj(trial, real=self.is_real())
 
-        self.inv_ovlp[0] = (
-            sherman_morrison(self.inv_ovlp[0], trial.psi[i,:nup].conj(), vtup)
-        )
-        self.inv_ovlp[1] = (
-            sherman_morrison(self.inv_ovlp[1], trial.psi[i,nup:].conj(), vtdown)
+        self.set_inv_ovlp(
+            sherman_morrison(self.inv_ovlp[0], psi_conj[i,:nup], vtup),
+            sherman_morrison(self.inv_ovlp[1], psi_conj[i,nup:], vtdown)
         )
 
     def calc_otrial(self, trial):
@@ -181,12 +214,13 @@ class SingleDetWalker(Walker):
             Overlap.
         """
         na = self.ndown
-        Oalpha = numpy.dot(trial.psi[:,:na].conj().T, self.phi[:,:na])
+        psiH = get_trial_adjoint(trial, real=self.is_real())
+        Oalpha = numpy.dot(psiH[:na], self.phi[:,:na])
         sign_a, logdet_a = numpy.linalg.slogdet(Oalpha)
         nb = self.ndown
         logdet_b, sign_b = 0.0, 1.0
         if nb > 0:
-            Obeta = numpy.dot(trial.psi[:,na:].conj().T, self.phi[:,na:])
+            Obeta = numpy.dot(psiH[na:], self.phi[:,na:])
             sign_b, logdet_b = numpy.linalg.slogdet(Obeta)
         
         ot = sign_a*sign_b*numpy.exp(logdet_a+logdet_b-self.log_shift)
@@ -237,9 +271,9 @@ class SingleDetWalker(Walker):
         if ndown > 0:
             Rdn_diag = numpy.diag(Rdn)
             signs_dn = numpy.sign(Rdn_diag)
-        self.phi[:,:nup] = numpy.dot(self.phi[:,:nup], numpy.diag(signs_up))
+        self.phi[:,:nup] *= signs_up
         if ndown > 0:
-            self.phi[:,nup:] = numpy.dot(self.phi[:,nup:], numpy.diag(signs_dn))
+            self.phi[:,nup:] *= signs_dn
         # include overlap factor
         # det(R) = \prod_ii R_ii
         # det(R) = exp(log(det(R))) = exp((sum_i log R_ii) - C)
@@ -274,19 +308,20 @@ class SingleDetWalker(Walker):
         if (ndown > 0):
             (self.phi[:,nup:], Rdown) = scipy.linalg.qr(self.phi[:,nup:],
                                                         mode='economic')
-        signs_up = numpy.diag(numpy.sign(numpy.diag(Rup)))
+        signs_up = numpy.sign(numpy.diag(Rup))
         if ndown > 0:
-            signs_down = numpy.diag(numpy.sign(numpy.diag(Rdown)))
-        buff = buff.dot(signs_up)
+            signs_down = numpy.sign(numpy.diag(Rdown))
+        buff *= signs_up
         self.phi[:,:self.ia[0]] = numpy.copy(buff[:,:self.ia[0]])
         self.phi[:,self.ia[0]:self.nup-1] = numpy.copy(buff[:,self.ia[0]+1:self.nup])
         self.phi[:,self.nup-1] = numpy.copy(buff[:,-1])
         if ndown > 0:
-            self.phi[:,nup:] = self.phi[:,nup:].dot(signs_down)
-        drup = scipy.linalg.det(signs_up.dot(Rup))
+            self.phi[:,nup:] *= signs_down
+        # R is upper triangular so det(R) is the product of its diagonal.
+        drup = numpy.prod(signs_up*numpy.diag(Rup))
         drdn = 1.0
         if ndown > 0:
-            drdn = scipy.linalg.det(signs_down.dot(Rdown))
+            drdn = numpy.prod(signs_down*numpy.diag(Rdown))
         detR = drup * drdn
         # This only affects free projection
         self.ot = self.ot / detR
@@ -307,16 +342,23 @@ class SingleDetWalker(Walker):
         nup = self.nup
         ndown = self.ndown
 
-        ovlp = numpy.dot(self.phi[:,:nup].T, trial.psi[:,:nup].conj())
-        self.Gmod[0] = numpy.dot(scipy.linalg.inv(ovlp), self.phi[:,:nup].T)
-        self.G[0] = numpy.dot(trial.psi[:,:nup].conj(), self.Gmod[0])
-        sign_a, log_ovlp_a = numpy.linalg.slogdet(ovlp)
+        # A single LU factorisation of each overlap matrix provides both the
+        # half rotated Green's function and the overlap.
+        psi_conj = get_trial_conj(trial, real=self.is_real())
+        phiT = self.phi[:,:nup].T
+        ovlp = numpy.dot(phiT, psi_conj[:,:nup])
+        lu = scipy.linalg.lu_factor(ovlp)
+        self.Gmod[0] = scipy.linalg.lu_solve(lu, phiT)
+        self.G[0] = numpy.dot(psi_conj[:,:nup], self.Gmod[0])
+        sign_a, log_ovlp_a = slogdet_lu(*lu)
         sign_b, log_ovlp_b = 1.0, 0.0
         if ndown > 0:
-            ovlp = numpy.dot(self.phi[:,nup:].T, trial.psi[:,nup:].conj())
-            sign_b, log_ovlp_b = numpy.linalg.slogdet(ovlp)
-            self.Gmod[1] = numpy.dot(scipy.linalg.inv(ovlp), self.phi[:,nup:].T)
-            self.G[1] = numpy.dot(trial.psi[:,nup:].conj(), self.Gmod[1])
+            phiT = self.phi[:,nup:].T
+            ovlp = numpy.dot(phiT, psi_conj[:,nup:])
+            lu = scipy.linalg.lu_factor(ovlp)
+            self.Gmod[1] = scipy.linalg.lu_solve(lu, phiT)
+            self.G[1] = numpy.dot(psi_conj[:,nup:], self.Gmod[1])
+            sign_b, log_ovlp_b = slogdet_lu(*lu)
         det = sign_a*sign_b*numpy.exp(log_ovlp_a+log_ovlp_b-self.log_shift)
         return det
 
@@ -333,9 +375,10 @@ class SingleDetWalker(Walker):
         nup = self.nup
         ndown = self.ndown
         self.Gmod[0] = self.phi[:,:nup].dot(self.inv_ovlp[0])
-        self.Gmod[1] = numpy.zeros(self.Gmod[0].shape)
         if (ndown>0):
             self.Gmod[1] = self.phi[:,nup:].dot(self.inv_ovlp[1])
+        else:
+            self.Gmod[1] = numpy.zeros(self.Gmod[0].shape)
 
     def local_energy(self, system, two_rdm=None, rchol=None, eri=None, UVT=None):
         """Compute walkers local energy
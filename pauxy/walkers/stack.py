@@ -48,6 +48,29 @@ class FieldConfig(object):
             if self.step % self.nbp == 0:
                 self.block = (self.block + 1) % self.nblock
 
+    def push_many(self, configs):
+        """Add a sequence of field configurations to buffer.
+
+        Equivalent to calling push for each element of configs but copies
+        contiguous runs of fields at once.
+
+        Parameters
+        ----------
+        configs : :class:`numpy.ndarray`
+            Auxilliary field configurations.
+        """
+        pos = 0
+        nconfig = len(configs)
+        while pos < nconfig:
+            nfill = min(self.nfields-self.ib, nconfig-pos)
+            self.configs[self.step, self.ib:self.ib+nfill] = configs[pos:pos+nfill]
+            pos += nfill
+            self.ib = (self.ib + nfill) % self.nfields
+            if self.ib == 0:
+                self.step = (self.step + 1)
+                if self.step % self.nbp == 0:
+                    self.block = (self.block + 1) % self.nblock
+
     def update(self, config, wfac):
         """Add full field configuration for walker to buffer.
 
@@ -1,7 +1,12 @@
+import copy
 import pytest
 import numpy
 
 from mpi4py import MPI
+from pauxy.systems.hubbard import Hubbard
+from pauxy.trial_wavefunction.multi_slater import MultiSlater
+from pauxy.walkers.handler import Walkers
+from pauxy.utils.misc import dotdict
 comm = MPI.COMM_WORLD
 numpy.random.seed(7)
 skip = comm.size == 1
@@ -78,3 +83,96 @@ def test_pair_branch():
         assert len(buff) == 2
         assert sum(buff[0]) == 2
         assert sum(buff[1]) == 0
+
+@pytest.mark.unit
+def test_walker_arrays():
+    system = Hubbard(inputs={'nx': 4, 'ny': 4, 'nup': 7, 'ndown': 7, 'U': 4})
+    eigs, eigv = numpy.linalg.eigh(system.H1[0])
+    wfn = numpy.zeros((1,system.nbasis,system.ne), dtype=numpy.complex128)
+    wfn[0,:,:system.nup] = eigv[:,:system.nup]
+    wfn[0,:,system.nup:] = eigv[:,:system.ndown]
+    trial = MultiSlater(system, (numpy.array([1.0+0j]), wfn))
+    qmc = dotdict({'dt': 0.01, 'nstblz': 5, 'nwalkers': 3})
+    walkers = Walkers(system, trial, qmc)
+    for (i, w) in enumerate(walkers.walkers):
+        w.phi *= i + 1
+        assert numpy.shares_memory(w.phi, walkers.phi_all)
+    walkers.copy_historic_wfn()
+    for w in walkers.walkers:
+        assert numpy.allclose(w.phi_old, w.phi)
+    # Walker data must remain views after population control.
+    walkers.walkers[0].set_buffer(walkers.walkers[2].get_buffer())
+    assert numpy.shares_memory(walkers.walkers[0].phi, walkers.phi_all)
+    assert numpy.allclose(walkers.phi_all[0], walkers.phi_all[2])
+
+@pytest.mark.unit
+def test_reortho_batched():
+    system = Hubbard(inputs={'nx': 4, 'ny': 4, 'nup': 7, 'ndown': 6, 'U': 4})
+    eigs, eigv = numpy.linalg.eigh(system.H1[0])
+    wfn = numpy.zeros((1,system.nbasis,system.ne), dtype=numpy.complex128)
+    wfn[0,:,:system.nup] = eigv[:,:system.nup]
+    wfn[0,:,system.nup:] = eigv[:,:system.ndown]
+    trial = MultiSlater(system, (numpy.array([1.0+0j]), wfn))
+    qmc = dotdict({'dt': 0.01, 'nstblz': 5, 'nwalkers': 3})
+    walkers = Walkers(system, trial, qmc)
+    numpy.random.seed(7)
+    walkers.phi_all[:] = numpy.random.random(walkers.phi_all.shape)
+    ref = [(w.phi.copy(), w.ot) for w in walkers.walkers]
+    walkers.orthogonalise(trial, True)
+    for (w, (phi, ot)) in zip(walkers.walkers, ref):
+        w_ref = copy.deepcopy(w)
+        w_ref.phi = phi
+        w_ref.ot = ot
+        w_ref.weight = 1.0
+        detR = w_ref.reortho(trial)
+        assert numpy.allclose(w.phi, w_ref.phi)
+        assert w.detR == pytest.approx(detR)
+        assert w.ot == pytest.approx(w_ref.ot)
+        assert w.weight == pytest.approx(detR)
+
+@pytest.mark.unit
+def test_greens_function_batched():
+    system = Hubbard(inputs={'nx': 4, 'ny': 4, 'nup': 7, 'ndown': 6, 'U': 4})
+    eigs, eigv = numpy.linalg.eigh(system.H1[0])
+    wfn = numpy.zeros((1,system.nbasis,system.ne), dtype=numpy.complex128)
+    wfn[0,:,:system.nup] = eigv[:,:system.nup]
+    wfn[0,:,system.nup:] = eigv[:,:system.ndown]
+    trial = MultiSlater(system, (numpy.array([1.0+0j]), wfn))
+    qmc = dotdict({'dt': 0.01, 'nstblz': 5, 'nwalkers': 3})
+    walkers = Walkers(system, trial, qmc)
+    numpy.random.seed(7)
+    walkers.phi_all[:] = (numpy.random.random(walkers.phi_all.shape) +
+                          1j*numpy.random.random(walkers.phi_all.shape))
+    walkers.recompute_greens_function(trial)
+    for w in walkers.walkers:
+        w_ref = copy.deepcopy(w)
+        w_ref.greens_function(trial)
+        assert numpy.allclose(w.G, w_ref.G)
+        assert numpy.allclose(w.Gmod[0], w_ref.Gmod[0])
+        assert numpy.allclose(w.Gmod[1], w_ref.Gmod[1])
+
+@pytest.mark.unit
+def test_read_walkers(tmp_path):
+    import h5py
+    system = Hubbard(inputs={'nx': 4, 'ny': 4, 'nup': 7, 'ndown': 7, 'U': 4})
+    eigs, eigv = numpy.linalg.eigh(system.H1[0])
+    wfn = numpy.zeros((1,system.nbasis,system.ne), dtype=numpy.complex128)
+    wfn[0,:,:system.nup] = eigv[:,:system.nup]
+    wfn[0,:,system.nup:] = eigv[:,:system.ndown]
+    qmc = dotdict({'dt': 0.01, 'nstblz': 5, 'nwalkers': 3})
+    numpy.random.seed(7)
+    data = numpy.random.random((3, 3+system.nbasis*system.ne)) + 0j
+    # Current format stores all walkers in a single dataset, older restart
+    # files one dataset per walker.
+    with h5py.File(tmp_path / 'restart.h5', 'w') as fh5:
+        fh5['walkers'] = data
+    with h5py.File(tmp_path / 'legacy.h5', 'w') as fh5:
+        for (i, d) in enumerate(data):
+            fh5['walker_%d'%i] = d
+    for fname in ['restart.h5', 'legacy.h5']:
+        trial = MultiSlater(system, (numpy.array([1.0+0j]), wfn))
+        walkers = Walkers(system, trial, qmc, comm=comm,
+                          walker_opts={'read_file': str(tmp_path / fname)})
+        for (w, d) in zip(walkers.walkers, data):
+            assert w.weight == pytest.approx(d[0])
+            assert numpy.allclose(w.phi.ravel(), d[3:])
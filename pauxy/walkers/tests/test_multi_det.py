@@ -102,3 +102,50 @@ def test_walker_energy():
         nume += trial.coeffs[i].conj()*ovlp*e
         deno += trial.coeffs[i].conj()*ovlp
     print(nume/deno,nume,deno,e0[0])
+
+@pytest.mark.unit
+def test_walker_inverse_overlap():
+    system = dotdict({'nup': 5, 'ndown': 4, 'nbasis': 10,
+                      'nelec': (5,4), 'ne': 9})
+    numpy.random.seed(7)
+    shape = (3,system.nbasis,system.ne)
+    wfn = numpy.random.rand(*shape) + 1j*numpy.random.rand(*shape)
+    coeffs = numpy.array([0.5+0j,0.3+0j,0.1+0j])
+    trial = MultiSlater(system, (coeffs, wfn))
+    walker = MultiDetWalker(system, trial)
+    walker.phi = (numpy.random.rand(*walker.phi.shape) +
+                  1j*numpy.random.rand(*walker.phi.shape))
+    walker.inverse_overlap(trial)
+    na = system.nup
+    for i, d in enumerate(trial.psi):
+        sa = numpy.dot(d[:,:na].conj().T, walker.phi[:,:na])
+        sb = numpy.dot(d[:,na:].conj().T, walker.phi[:,na:])
+        assert numpy.allclose(walker.inv_ovlp[0][i], numpy.linalg.inv(sa))
+        assert numpy.allclose(walker.inv_ovlp[1][i], numpy.linalg.inv(sb))
+
+@pytest.mark.unit
+def test_walker_greens_function():
+    system = dotdict({'nup': 5, 'ndown': 4, 'nbasis': 10,
+                      'nelec': (5,4), 'ne': 9})
+    numpy.random.seed(7)
+    shape = (3,system.nbasis,system.ne)
+    wfn = numpy.random.rand(*shape) + 1j*numpy.random.rand(*shape)
+    coeffs = numpy.array([0.5+0j,0.3+0j,0.1+0j])
+    trial = MultiSlater(system, (coeffs, wfn))
+    walker = MultiDetWalker(system, trial)
+    walker.phi = (numpy.random.rand(*walker.phi.shape) +
+                  1j*numpy.random.rand(*walker.phi.shape))
+    ovlp = walker.greens_function(trial)
+    na = system.nup
+    ref = 0.0
+    for i, d in enumerate(trial.psi):
+        sa = numpy.dot(d[:,:na].conj().T, walker.phi[:,:na])
+        sb = numpy.dot(d[:,na:].conj().T, walker.phi[:,na:])
+        ga = numpy.dot(walker.phi[:,:na],
+                       numpy.dot(numpy.linalg.inv(sa), d[:,:na].conj().T)).T
+        gb = numpy.dot(walker.phi[:,na:],
+                       numpy.dot(numpy.linalg.inv(sb), d[:,na:].conj().T)).T
+        assert numpy.allclose(walker.Gi[i,0], ga)
+        assert numpy.allclose(walker.Gi[i,1], gb)
+        ref += coeffs[i].conj()*numpy.linalg.det(sa)*numpy.linalg.det(sb)
+    assert ovlp == pytest.approx(ref)
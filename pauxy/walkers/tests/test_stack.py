@@ -0,0 +1,17 @@
+import numpy
+import pytest
+from pauxy.walkers.stack import FieldConfig
+
+@pytest.mark.unit
+def test_field_config_push_many():
+    numpy.random.seed(7)
+    fields = numpy.random.randint(0, 2, size=4*6*5)
+    ref = FieldConfig(6, 20, 5, numpy.int32)
+    for xi in fields:
+        ref.push(xi)
+    fc = FieldConfig(6, 20, 5, numpy.int32)
+    # Chunks which do not align with the number of fields per step.
+    for chunk in numpy.split(fields, [4, 11, 23, 60, 61]):
+        fc.push_many(chunk)
+    assert numpy.array_equal(fc.configs, ref.configs)
+    assert (fc.step, fc.ib, fc.block) == (ref.step, ref.ib, ref.block)
@@ -107,12 +107,24 @@ class Walker(object):
         for d in self.buff_names:
             data = self.__dict__[d]
             if isinstance(data, numpy.ndarray):
-                self.__dict__[d] = buff[s:s+data.size].reshape(data.shape).copy()
+                if data.dtype == buff.dtype:
+                    # Copy inplace so views of walker data remain valid.
+                    data[...] = buff[s:s+data.size].reshape(data.shape)
+                elif data.dtype == buff.real.dtype:
+                    # Real walker arrays stay real.
+                    data[...] = buff[s:s+data.size].real.reshape(data.shape)
+                else:
+                    self.__dict__[d] = buff[s:s+data.size].reshape(data.shape).copy()
                 s += data.size
             elif isinstance(data, list):
                 for ix, l in enumerate(data):
                     if isinstance(l, (numpy.ndarray)):
-                        self.__dict__[d][ix] = buff[s:s+l.size].reshape(l.shape).copy()
+                        if l.dtype == buff.dtype:
+                            l[...] = buff[s:s+l.size].reshape(l.shape)
+                        elif l.dtype == buff.real.dtype:
+                            l[...] = buff[s:s+l.size].real.reshape(l.shape)
+                        else:
+                            self.__dict__[d][ix] = buff[s:s+l.size].reshape(l.shape).copy()
                         s += l.size
                     elif isinstance(l, (int, float, complex)):
                         self.__dict__[d][ix] = buff[s]